@@ -2,7 +2,8 @@ import os
 import streamlit as st
 import streamlit.components.v1 as components
 from story_generator import template_generator
-from story_store import load_stories, random_story, filter_stories
+from story_sampler import StorySampler
+from story_store import load_stories, story_animals
 import io
 import base64
 
@@ -21,6 +22,17 @@ except ImportError:
 
 st.set_page_config(page_title="Storytime for Kids", layout="wide")
 
+# Keep a few AI stories ready in the background so "Generate story" can be
+# answered instantly (started once per process; later reruns reuse it)
+if template_generator.LLM_AVAILABLE:
+    template_generator.start_story_pool()
+    # Opt-in model tiering, e.g. STORY_LLM_TIERS=gpt2,distilgpt2,sshleifer/tiny-gpt2
+    if os.environ.get("STORY_LLM_TIERS"):
+        template_generator.start_model_tiering(
+            [name.strip() for name in os.environ["STORY_LLM_TIERS"].split(",") if name.strip()],
+            latency_budget=float(os.environ.get("STORY_LLM_LATENCY_BUDGET", "3.0")),
+        )
+
 def generate_audio(text: str):
     """Generate audio from text using Google TTS"""
     try:
@@ -161,6 +173,8 @@ if 'story_metadata' not in st.session_state:
 # Top-level tabs: Generator and Stories Library
 tab = st.tabs(["Generator", "Stories Library"])
 
+# Shared, read-only library; only re-parsed when stories.json changes
+# (STORY_STORE_ENGINE=sqlite|jsonl serve it lazily from a SQLite database or a memory-mapped JSONL file)
 stories_data = load_stories()
 
 # -------- Generator tab (two-column layout) --------
@@ -231,17 +245,26 @@ with tab[0]:
             </style>
             """, unsafe_allow_html=True)
         
-        # Generate the story and store in session state
-        result = template_generator.generate_story(
+        # Generate the story, rendering sentences as soon as they are ready
+        with story_area:
+            stream_container = st.empty()
+        result = None
+        for partial in template_generator.generate_story_stream(
             prompt='',
             child_name=child_name or None,
             favorite_animal=(None if favorite_animal == "(Random)" else favorite_animal),
-            voice_friendly=False,
             use_llm=use_ai,
-        )
-        
-        # Clear the loading animation
-        loading_container.empty()
+        ):
+            if result is None:
+                # Clear the loading animation once the first sentences arrive
+                loading_container.empty()
+            result = partial
+            partial_sentences = [s.strip() for s in partial.split('. ') if s.strip()]
+            partial_html = ''.join(f'<p class="story-line">{sent.rstrip(".")}</p>' for sent in partial_sentences)
+            stream_container.markdown(f'<div class="story-box">{partial_html}</div>', unsafe_allow_html=True)
+
+        # The full story is rendered below together with the animal badge
+        stream_container.empty()
         
         # Store the story and metadata in session state
         st.session_state.generated_story = result
@@ -257,20 +280,14 @@ with tab[0]:
         if favorite_animal and favorite_animal != "(Random)":
             chosen_animal = favorite_animal
 
-        # If still unknown, try to guess from the generated story text
+        # If still unknown, the animal mentioned first in the story is the main character
         if not chosen_animal:
-            for a in ["Lion","Elephant","Gorilla","Pig","Monkey","Bear","Rabbit","Duck","Fox","Turtle"]:
-                if a.lower() in result.lower():
-                    chosen_animal = a
-                    break
+            chosen_animal = template_generator.ANIMAL_MATCHER.first(result)
 
         with story_area:
             # show big emoji and name if available
-            emoji_map = {"Lion": "🦁", "Elephant": "🐘", "Gorilla": "🦍", "Pig": "🐷", "Monkey": "🐵", "Bear": "🐻", "Rabbit": "🐰", "Duck": "🦆", "Fox": "🦊", "Turtle": "🐢",
-                        "Cat": "🐱", "Dog": "🐶", "Panda": "🐼", "Penguin": "🐧", "Owl": "🦉", "Frog": "🐸", "Koala": "🐨", "Zebra": "🦓", "Giraffe": "🦒", "Hippo": "🦛", 
-                        "Sheep": "🐑", "Cow": "🐄", "Horse": "🐴", "Tiger": "🐅", "Deer": "🦌"}
             if chosen_animal:
-                st.markdown(f"<div style='text-align:center; margin-bottom:10px;'><div style='font-size:80px; margin-bottom:5px;'>{emoji_map.get(chosen_animal, '')}</div><div style='font-size:22px; font-weight:700; margin-bottom:10px;'>Story about {chosen_animal} and {child_name}</div></div>", unsafe_allow_html=True)
+                st.markdown(f"<div style='text-align:center; margin-bottom:10px;'><div style='font-size:80px; margin-bottom:5px;'>{template_generator.EMOJI.get(chosen_animal, '')}</div><div style='font-size:22px; font-weight:700; margin-bottom:10px;'>Story about {chosen_animal} and {child_name}</div></div>", unsafe_allow_html=True)
 
             # Break sentences into readable paragraphs
             sentences = [s.strip() for s in result.split('. ') if s.strip()]
@@ -566,16 +583,21 @@ with tab[0]:
 # -------- Stories Library (card grid) --------
 with tab[1]:
     st.header("Stories Library")
-    animals = sorted({s.get("animal", "").split()[0] for s in stories_data if s.get("animal")})
+    animals = story_animals(stories_data)
     # Simplified library: choose animal or pick random (single dropdown)
     animals_options = ["All"] + animals
     chosen_animal = st.selectbox("Choose animal", options=animals_options)
 
-    filtered = filter_stories(stories_data, animal=None if chosen_animal == "All" else chosen_animal)
+    # Per-session shuffle bags: no repeats until every matching story has been shown
+    sampler = st.session_state.get("story_sampler")
+    if sampler is None or sampler.stories is not stories_data:
+        sampler = st.session_state.story_sampler = StorySampler(stories_data)
+    animal_filter = None if chosen_animal == "All" else chosen_animal
     if st.button("Random story from library"):
-        chosen = random_story(filtered)
+        chosen = sampler.draw(animal=animal_filter)
     else:
         # show the first matching story for the selected animal (or the first overall)
+        filtered = sampler.view(animal=animal_filter)
         chosen = None
         if filtered:
             chosen = filtered[0]
@@ -583,9 +605,7 @@ with tab[1]:
     if chosen:
         st.subheader(chosen.get('title',''))
         animal = chosen.get('animal','')
-        emoji = {"Lion": "🦁", "Elephant": "🐘", "Gorilla": "🦍", "Pig": "🐷", "Monkey": "🐵", "Bear": "🐻", "Rabbit": "🐰", "Duck": "🦆", "Fox": "🦊", "Turtle": "🐢",
-                "Cat": "🐱", "Dog": "🐶", "Panda": "🐼", "Penguin": "🐧", "Owl": "🦉", "Frog": "🐸", "Koala": "🐨", "Zebra": "🦓", "Giraffe": "🦒", "Hippo": "🦛", 
-                "Sheep": "🐑", "Cow": "🐄", "Horse": "🐴", "Tiger": "🐅", "Deer": "🦌"}.get(animal.split()[0], '')
+        emoji = template_generator.EMOJI.get(template_generator.ANIMAL_MATCHER.first(animal), '')
         st.markdown(f"<div style='text-align:center; margin-bottom:10px;'><div style='font-size:70px; margin-bottom:5px;'>{emoji}</div><div style='font-weight:700; font-size:18px; margin-bottom:8px;'>{animal}</div></div>", unsafe_allow_html=True)
         sentences = [s.strip() for s in chosen.get('story','').split('. ') if s.strip()]
         story_html = ''.join(f'<p class="story-line">{sent.rstrip(".")}</p>' for sent in sentences)
@@ -0,0 +1,41 @@
+"""Find known animal names in free text with one precompiled regex.
+
+The pattern is a single case-insensitive alternation of all names, longest
+first, matched on word boundaries with an optional plural ("lions", "foxes").
+One `finditer` pass over the text finds every mention, so no per-animal
+`.lower()`/substring scans are needed, and "cat" no longer matches inside
+"category".
+"""
+import re
+from typing import Dict, Iterable, List, Optional
+
+
+class AnimalMatcher:
+    def __init__(self, names: Iterable[str]):
+        self.names = list(names)
+        self._canonical: Dict[str, str] = {name.lower(): name for name in self.names}
+        alternation = "|".join(re.escape(name) for name in sorted(self._canonical, key=len, reverse=True))
+        self._pattern = re.compile(rf"\b({alternation})(?:es|s)?\b", re.IGNORECASE)
+
+    def first(self, text: Optional[str]) -> Optional[str]:
+        """The animal mentioned first in `text`, or None."""
+        if not text:
+            return None
+        match = self._pattern.search(text)
+        return self._canonical[match.group(1).lower()] if match else None
+
+    def find_all(self, text: Optional[str]) -> List[str]:
+        """Every distinct animal in `text`, in order of first mention."""
+        if not text:
+            return []
+        found: Dict[str, None] = {}
+        for match in self._pattern.finditer(text):
+            found.setdefault(self._canonical[match.group(1).lower()])
+        return list(found)
+
+    def canonical(self, name: Optional[str]) -> Optional[str]:
+        """Map a name like " owls " or "OWL" to "Owl"; None if it is not an animal."""
+        if not name:
+            return None
+        match = self._pattern.fullmatch(name.strip())
+        return self._canonical[match.group(1).lower()] if match else None
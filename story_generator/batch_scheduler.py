@@ -0,0 +1,291 @@
+"""In-process micro-batching scheduler for LLM story requests.
+
+Every Streamlit session runs on its own script thread. Instead of letting each
+thread call `model.generate` on its own (and fight over CPU cores), sessions
+submit prompts here. A single worker thread groups requests that arrive close
+together into one `generate_batch` call and hands each result back through a
+`concurrent.futures.Future`. Streaming requests go through the same queue and
+run on the same worker, one at a time, so the model and its tokenizer are
+only ever used by one thread.
+"""
+import queue
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+from .model_registry import get_generator
+
+
+class _Request:
+    __slots__ = ("prompt", "prefix", "seed", "key", "future", "enqueued_at", "chunks", "abandoned")
+
+    def __init__(self, prompt: str, key: Tuple, future: Future, prefix: Optional[str] = None, seed: Optional[int] = None,
+                 chunks: Optional[queue.Queue] = None):
+        self.prompt = prompt
+        self.prefix = prefix
+        self.seed = seed
+        self.key = key
+        self.future = future
+        self.enqueued_at = time.monotonic()
+        # Streaming requests only: text chunks for the caller, then None
+        self.chunks = chunks
+        self.abandoned = False
+
+
+class BatchScheduler:
+    """Queue LLM prompts from all sessions and run them in micro-batches.
+
+    - max_batch_size: most prompts sent to the model in one call
+    - max_wait_ms: how long the oldest queued request may wait for company
+    - generator_factory: returns the generator for a model name (defaults to
+      the shared model registry)
+
+    Only requests with the same model and sampling settings are batched
+    together; others wait for their own batch. Streaming requests
+    (`submit_stream`) always run alone.
+    """
+
+    def __init__(
+        self,
+        max_batch_size: int = 8,
+        max_wait_ms: float = 50.0,
+        generator_factory: Optional[Callable[[str], object]] = None,
+    ):
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self._generator_factory = generator_factory or get_generator
+        self._queue: Deque[_Request] = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._batches = 0
+        self._served = 0
+        self._streams = 0
+        self._in_flight = 0
+        self._last_batch_size = 0
+        self._largest_batch = 0
+        self._worker = threading.Thread(target=self._run, name="llm-batch-scheduler", daemon=True)
+        self._worker.start()
+
+    def submit(
+        self,
+        prompt: str,
+        model_name: str = "gpt2",
+        max_new_tokens: int = 50,
+        temperature: float = 1.0,
+        prefix: Optional[str] = None,
+        max_sentences: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> Future:
+        """Queue `prompt` for generation. The future resolves to the generated text.
+
+        `prefix` is the fixed start of the prompt; when a request ends up
+        running alone it resumes from the generator's cached prefix state.
+        `max_sentences` stops each story as soon as it is complete. A `seed`
+        makes the request's sample reproducible whatever it is batched with.
+        """
+        future: Future = Future()
+        self._enqueue(_Request(prompt, (model_name, max_new_tokens, temperature, max_sentences), future, prefix, seed))
+        return future
+
+    def submit_stream(
+        self,
+        prompt: str,
+        model_name: str = "gpt2",
+        max_new_tokens: int = 50,
+        temperature: float = 1.0,
+        prefix: Optional[str] = None,
+        max_sentences: Optional[int] = None,
+        seed: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Queue `prompt` for streaming generation and yield new text as it is produced.
+
+        Arguments are as for `submit`. The worker runs the stream between
+        batches and relays the generator's chunks; errors are raised here once
+        the stream ends. Closing the iterator early cancels the request, or
+        stops relaying if it is already running.
+        """
+        request = _Request(prompt, (model_name, max_new_tokens, temperature, max_sentences), Future(), prefix, seed,
+                           chunks=queue.Queue())
+        self._enqueue(request)
+        return self._relay(request)
+
+    @staticmethod
+    def _relay(request: _Request) -> Iterator[str]:
+        try:
+            while True:
+                chunk = request.chunks.get()
+                if chunk is None:
+                    break
+                yield chunk
+            request.future.result()
+        finally:
+            request.abandoned = True
+            request.future.cancel()
+
+    def _enqueue(self, request: _Request) -> None:
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BatchScheduler has been shut down")
+            self._queue.append(request)
+            self._cond.notify()
+
+    def stats(self) -> Dict[str, float]:
+        """Counters for tuning throughput against latency."""
+        with self._cond:
+            return {
+                "queue_depth": len(self._queue),
+                "in_flight": self._in_flight,
+                "batches": self._batches,
+                "requests_served": self._served,
+                "streams_served": self._streams,
+                "last_batch_size": self._last_batch_size,
+                "max_batch_size_seen": self._largest_batch,
+                "avg_batch_size": (self._served / self._batches) if self._batches else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting requests; queued requests are still served."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        if wait:
+            self._worker.join()
+
+    def _next_batch(self) -> List[_Request]:
+        """Block until a batch is ready and pop it from the queue."""
+        with self._cond:
+            while not self._queue:
+                if self._closed:
+                    return []
+                self._cond.wait()
+
+            if self._queue[0].chunks is not None:
+                self._in_flight = 1
+                return [self._queue.popleft()]
+
+            # Give other sessions a short window to join the oldest request
+            deadline = self._queue[0].enqueued_at + self.max_wait_ms / 1000.0
+            while not self._closed:
+                key = self._queue[0].key
+                if sum(1 for r in self._queue if r.key == key and r.chunks is None) >= self.max_batch_size:
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+
+            key = self._queue[0].key
+            batch: List[_Request] = []
+            rest: Deque[_Request] = deque()
+            for request in self._queue:
+                if request.key == key and request.chunks is None and len(batch) < self.max_batch_size:
+                    batch.append(request)
+                else:
+                    rest.append(request)
+            self._queue = rest
+            self._in_flight = len(batch)
+            return batch
+
+    def _run_stream(self, request: _Request) -> None:
+        model_name, max_new_tokens, temperature, max_sentences = request.key
+        try:
+            stream = self._generator_factory(model_name).generate_stream(
+                request.prompt,
+                max_new_tokens=max_new_tokens,
+                temperature=temperature,
+                prefix=request.prefix,
+                max_sentences=max_sentences,
+                seed=request.seed,
+            )
+            try:
+                for chunk in stream:
+                    if request.abandoned:
+                        break
+                    request.chunks.put(chunk)
+            finally:
+                # Closing waits for the generation thread, so the next batch has the model to itself
+                close = getattr(stream, "close", None)
+                if close is not None:
+                    close()
+        except Exception as e:
+            request.future.set_exception(e)
+        else:
+            request.future.set_result(None)
+        request.chunks.put(None)
+        with self._cond:
+            self._streams += 1
+            self._in_flight = 0
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            if not batch:
+                return
+            # Skip requests whose caller already gave up on them
+            batch = [r for r in batch if r.future.set_running_or_notify_cancel()]
+            if not batch:
+                with self._cond:
+                    self._in_flight = 0
+                continue
+            if batch[0].chunks is not None:
+                self._run_stream(batch[0])
+                continue
+            model_name, max_new_tokens, temperature, max_sentences = batch[0].key
+            try:
+                generator = self._generator_factory(model_name)
+                if len(batch) == 1 and batch[0].prefix:
+                    texts = [generator.generate(
+                        batch[0].prompt,
+                        max_new_tokens=max_new_tokens,
+                        temperature=temperature,
+                        prefix=batch[0].prefix,
+                        max_sentences=max_sentences,
+                        seed=batch[0].seed,
+                    )]
+                else:
+                    texts = generator.generate_batch(
+                        [r.prompt for r in batch],
+                        max_new_tokens=max_new_tokens,
+                        temperature=temperature,
+                        max_sentences=max_sentences,
+                        seeds=[r.seed for r in batch],
+                    )
+            except Exception as e:
+                for request in batch:
+                    request.future.set_exception(e)
+            else:
+                for request, text in zip(batch, texts):
+                    request.future.set_result(text)
+            with self._cond:
+                self._batches += 1
+                self._served += len(batch)
+                self._last_batch_size = len(batch)
+                self._largest_batch = max(self._largest_batch, len(batch))
+                self._in_flight = 0
+
+
+_scheduler: Optional[BatchScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> BatchScheduler:
+    """Return the process-wide scheduler shared by all app sessions."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = BatchScheduler()
+        return _scheduler
+
+
+def configure_scheduler(max_batch_size: int = 8, max_wait_ms: float = 50.0) -> BatchScheduler:
+    """Replace the shared scheduler with one using the given batching limits."""
+    global _scheduler
+    with _scheduler_lock:
+        old, _scheduler = _scheduler, BatchScheduler(max_batch_size=max_batch_size, max_wait_ms=max_wait_ms)
+    if old is not None:
+        old.shutdown(wait=False)
+    return _scheduler
@@ -0,0 +1,134 @@
+"""Bulk template story generation for offline batch jobs.
+
+`generate_stories(n, ...)` produces the same stories as `generate_story(...,
+use_llm=False)`, but for n stories at once. The phrase banks are compiled
+once per (prompt, child_name) into per-character tables of finished text:
+
+- head: greeting line + location line, indexed by greeting * len(LOCATIONS) + location
+- middle: life lesson line + tech lesson line, indexed the same way
+- tail: fun line + the prompt/name/farewell lines, indexed by fun part
+
+All random choices for the n stories are drawn as NumPy index arrays, and
+each story is the concatenation of three table lookups.
+
+Requires NumPy; template_generator imports this module only when
+`generate_stories` is called.
+"""
+import random
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .template_generator import (
+    CHARACTERS,
+    EMOJI,
+    FAREWELL,
+    FUN_PARTS,
+    GREETINGS,
+    LIFE_LESSONS,
+    LOCATIONS,
+    PERSONAL_GREETINGS,
+    PERSONAL_LIFE_LESSONS,
+    TECH_LESSONS,
+    _extract_animal_from_prompt,
+    _fun_action,
+    _is_goodnight_line,
+    _match_favorite_animal,
+    _skip_prompt_line,
+    _strip_leading_they,
+)
+
+
+def _kept(line: str) -> Tuple[str, ...]:
+    """The line as a 0/1-tuple, dropping goodnight lines like the template does."""
+    return () if _is_goodnight_line(line) else (line,)
+
+
+@lru_cache(maxsize=64)
+def _line_tables(prompt: str, name: str) -> Tuple[Tuple[Tuple[str, ...], ...], ...]:
+    """Per-character lines for every phrase bank choice.
+
+    Returns (heads, middles, tails): each is indexed [character][combined choice]
+    and holds the lines of that part of the story.
+    """
+    greetings = [g.format(name=name) for g in PERSONAL_GREETINGS] if name else GREETINGS
+    lives = [lesson.format(name=name) for lesson in PERSONAL_LIFE_LESSONS] if name else LIFE_LESSONS
+    techs = [_strip_leading_they(t).rstrip('.') for t in TECH_LESSONS]
+    fun_actions = [_fun_action(f).rstrip('.') for f in FUN_PARTS]
+    prompt_animal = _extract_animal_from_prompt(prompt)
+
+    heads, middles, tails = [], [], []
+    for character in CHARACTERS:
+        emoji = EMOJI.get(character, "")
+        who = f"{emoji} {character}" if emoji else character
+        heads.append(tuple(
+            _kept(f"{who} {greet}") + _kept(f"{who} {location}.")
+            for greet in greetings for location in LOCATIONS
+        ))
+        middles.append(tuple(
+            _kept(f"{character} says {life.rstrip('.')}.") + _kept(f"{character} says {tech}.")
+            for life in lives for tech in techs
+        ))
+
+        suffix: Tuple[str, ...] = ()
+        if prompt and not _skip_prompt_line(prompt, prompt_animal, character):
+            suffix += _kept(f"They thought about {prompt}.")
+        if name:
+            suffix += _kept(f"{character} waved a little hello to {name}.")
+        suffix += (f"Goodnight, {name} — sweet dreams.",) if name else (FAREWELL,)
+        tails.append(tuple(_kept(f"{character} {action}.") + suffix for action in fun_actions))
+    return tuple(heads), tuple(middles), tuple(tails)
+
+
+@lru_cache(maxsize=64)
+def _text_tables(prompt: str, name: str, marker: str) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """`_line_tables` joined into flat object arrays of text, ready for fancy indexing."""
+    heads, middles, tails = _line_tables(prompt, name)
+
+    def _flat(table, lead: str = "", trail: str = " ") -> np.ndarray:
+        return np.array([lead + " ".join(lines) + trail for row in table for lines in row], dtype=object)
+
+    return _flat(heads, lead=f"{marker} "), _flat(middles), _flat(tails, trail="")
+
+
+def generate_stories(n: int, prompt: str = "", child_name: Optional[str] = None, favorite_animal: Optional[str] = None,
+                     voice_friendly: bool = False, seed=None, marker: str = "📝") -> List:
+    """Generate `n` template stories at once.
+
+    Arguments match `generate_story` (template path). `seed` is an int, a
+    numpy.random.Generator or a random.Random; the same seed gives the same
+    stories. Returns a list of strings, or of line lists when voice_friendly=True.
+    """
+    if isinstance(seed, random.Random):
+        seed = seed.getrandbits(64)
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    prompt = prompt or ""
+    name = child_name.strip() if child_name else ""
+
+    character = _match_favorite_animal(favorite_animal) or _extract_animal_from_prompt(prompt)
+    if character is not None:
+        chars = np.full(n, CHARACTERS.index(character), dtype=np.intp)
+    else:
+        chars = rng.integers(len(CHARACTERS), size=n)
+
+    greet_count = len(PERSONAL_GREETINGS) if name else len(GREETINGS)
+    life_count = len(PERSONAL_LIFE_LESSONS) if name else len(LIFE_LESSONS)
+    head_width = greet_count * len(LOCATIONS)
+    middle_width = life_count * len(TECH_LESSONS)
+    head_idx = chars * head_width + rng.integers(greet_count, size=n) * len(LOCATIONS) + rng.integers(len(LOCATIONS), size=n)
+    middle_idx = chars * middle_width + rng.integers(life_count, size=n) * len(TECH_LESSONS) + rng.integers(len(TECH_LESSONS), size=n)
+    tail_idx = chars * len(FUN_PARTS) + rng.integers(len(FUN_PARTS), size=n)
+
+    if voice_friendly:
+        heads, middles, tails = (
+            [lines for row in table for lines in row] for table in _line_tables(prompt, name)
+        )
+        return [
+            [*heads[h], *middles[m], *tails[t]]
+            for h, m, t in zip(head_idx.tolist(), middle_idx.tolist(), tail_idx.tolist())
+        ]
+
+    heads, middles, tails = _text_tables(prompt, name, marker)
+    # Object-array addition concatenates the looked-up strings in one C loop
+    return (heads[head_idx] + middles[middle_idx] + tails[tail_idx]).tolist()
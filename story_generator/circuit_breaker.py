@@ -0,0 +1,147 @@
+"""Circuit breaker that sheds LLM load when GPT-2 is persistently slow.
+
+The breaker watches a rolling window of LLM runs (latency and success). When
+p50/p95 latency or the error rate crosses its threshold it "opens": every
+session gets template stories for `cooldown_seconds`. Then it lets a few probe
+requests through ("half open"); if they are fast and succeed it closes again,
+otherwise it re-opens for another cooldown.
+"""
+import math
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple
+
+
+class LLMLoadShed(RuntimeError):
+    """Raised instead of running the LLM while the breaker sheds load."""
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted, non-empty list."""
+    rank = math.ceil(pct / 100.0 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+class LLMCircuitBreaker:
+    """Track rolling LLM latency/error rate and decide whether to use the LLM.
+
+    - window: number of recent LLM runs considered
+    - min_samples: runs needed before the breaker may open
+    - p50_threshold / p95_threshold: latency limits in seconds
+    - error_rate_threshold: fraction of failed runs that opens the breaker
+    - cooldown_seconds: how long to serve templates before probing
+    - probe_requests: successful probes needed to close again
+    """
+
+    def __init__(
+        self,
+        window: int = 50,
+        min_samples: int = 10,
+        p50_threshold: float = 4.0,
+        p95_threshold: float = 8.0,
+        error_rate_threshold: float = 0.3,
+        cooldown_seconds: float = 60.0,
+        probe_requests: int = 3,
+    ):
+        self.min_samples = min_samples
+        self.p50_threshold = p50_threshold
+        self.p95_threshold = p95_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.cooldown_seconds = cooldown_seconds
+        self.probe_requests = probe_requests
+        self._samples: Deque[Tuple[float, bool]] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._changed_at = time.monotonic()
+        self._probes_started = 0
+        self._probes_passed = 0
+        self._trips = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._advance(time.monotonic())
+            return self._state
+
+    def allow(self, now: Optional[float] = None) -> bool:
+        """Return True if this request may use the LLM."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._advance(now)
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_started < self.probe_requests:
+                self._probes_started += 1
+                return True
+            return False
+
+    def record(self, latency: float, ok: bool = True, now: Optional[float] = None) -> None:
+        """Report the latency (seconds) and outcome of one LLM run."""
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._advance(now)
+            if self._state == OPEN:
+                # Stragglers from before the trip do not count
+                return
+            if self._state == HALF_OPEN:
+                if not ok or latency > self.p95_threshold:
+                    self._open(now)
+                    return
+                self._probes_passed += 1
+                if self._probes_passed >= self.probe_requests:
+                    self._samples.clear()
+                    self._set_state(CLOSED, now)
+                return
+            self._samples.append((latency, ok))
+            if self._should_trip():
+                self._open(now)
+
+    def stats(self, now: Optional[float] = None) -> Dict[str, float]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._advance(now)
+            latencies = sorted(latency for latency, _ in self._samples)
+            errors = sum(1 for _, ok in self._samples if not ok)
+            return {
+                "state": self._state,
+                "samples": len(self._samples),
+                "p50": _percentile(latencies, 50) if latencies else 0.0,
+                "p95": _percentile(latencies, 95) if latencies else 0.0,
+                "error_rate": errors / len(self._samples) if self._samples else 0.0,
+                "trips": self._trips,
+            }
+
+    def _should_trip(self) -> bool:
+        if len(self._samples) < self.min_samples:
+            return False
+        latencies = sorted(latency for latency, _ in self._samples)
+        error_rate = sum(1 for _, ok in self._samples if not ok) / len(self._samples)
+        return (
+            _percentile(latencies, 50) > self.p50_threshold
+            or _percentile(latencies, 95) > self.p95_threshold
+            or error_rate > self.error_rate_threshold
+        )
+
+    def _open(self, now: float) -> None:
+        self._trips += 1
+        self._set_state(OPEN, now)
+
+    def _set_state(self, state: str, now: float) -> None:
+        self._state = state
+        self._changed_at = now
+        self._probes_started = 0
+        self._probes_passed = 0
+
+    def _advance(self, now: float) -> None:
+        """Apply time-based transitions (caller holds the lock)."""
+        if self._state == OPEN and now - self._changed_at >= self.cooldown_seconds:
+            self._set_state(HALF_OPEN, now)
+        elif self._state == HALF_OPEN and now - self._changed_at >= self.cooldown_seconds:
+            # Probes that never reported back must not wedge the breaker
+            self._set_state(HALF_OPEN, now)
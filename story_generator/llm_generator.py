@@ -2,37 +2,584 @@
 
 This file is optional and requires installing `transformers` and a suitable `torch`.
 It uses the small `gpt2` model by default which can run on CPU but may be slow.
+
+`LLMGenerator` delegates to an inference backend from BACKENDS: PyTorch eager
+mode ("torch", default) or ONNX Runtime on CPU ("onnx", needs `optimum`).
 """
-from typing import Optional
+import copy
+import io
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, Iterator, List, Optional
 
 try:
-    from transformers import AutoTokenizer, AutoModelForCausalLM
+    from transformers import (
+        AutoTokenizer,
+        AutoModelForCausalLM,
+        LogitsProcessor,
+        LogitsProcessorList,
+        StoppingCriteria,
+        StoppingCriteriaList,
+        TextIteratorStreamer,
+    )
     import torch
+    from .model_loading import load_model_mmap, load_tokenizer_offline, resolve_snapshot
 except Exception:
     AutoTokenizer = None
     AutoModelForCausalLM = None
+    LogitsProcessor = object
+    LogitsProcessorList = None
+    StoppingCriteria = object
+    StoppingCriteriaList = None
+    TextIteratorStreamer = None
     torch = None
 
+# Phrases that mark the end of a bedtime story
+STORY_END_PHRASES = ("goodnight", "sweet dreams")
 
-class LLMGenerator:
-    def __init__(self, model_name: str = "gpt2"):
+
+def _complete_sentence_count(text: str) -> int:
+    """Count '.'-terminated sentences the way _clean_generated_story splits them."""
+    return sum(1 for s in text.split('.')[:-1] if s.strip())
+
+
+def _has_finished_farewell(text: str) -> bool:
+    """True once a goodnight/sweet dreams sentence in `text` has been closed."""
+    low = text.lower()
+    for phrase in STORY_END_PHRASES:
+        at = low.find(phrase)
+        if at != -1 and any(p in low[at:] for p in ".!?"):
+            return True
+    return False
+
+
+class StoryStoppingCriteria(StoppingCriteria):
+    """Stop each sequence once the story is complete.
+
+    A sequence is done when the prompt plus its continuation holds
+    `max_sentences` sentences, or when the continuation has closed a
+    goodnight / sweet dreams line. Anything past that point would be cut by
+    _clean_generated_story anyway, so there is no point decoding it.
+    Returns one flag per batch row so finished rows stop independently.
+    """
+
+    def __init__(self, tokenizer, prompts: List[str], prompt_length: int, max_sentences: int = 6):
+        self.tokenizer = tokenizer
+        self.prompts = prompts
+        self.prompt_length = prompt_length
+        self.max_sentences = max_sentences
+
+    def __call__(self, input_ids, scores, **kwargs):
+        continuations = self.tokenizer.batch_decode(input_ids[:, self.prompt_length:], skip_special_tokens=True)
+        done = [
+            _complete_sentence_count(prompt + text) >= self.max_sentences or _has_finished_farewell(text)
+            for prompt, text in zip(self.prompts, continuations)
+        ]
+        return torch.tensor(done, dtype=torch.bool, device=input_ids.device)
+
+
+class SeededSampler(LogitsProcessor):
+    """Sample each row's next token from its own seeded torch.Generator.
+
+    `model.generate(do_sample=True)` draws from torch's global RNG, which every
+    thread shares. Seeded requests instead run greedy decoding with this
+    processor: it applies temperature, top-k and top-p like the sampling path,
+    draws the token with the row's generator and masks every other token, so
+    greedy search picks exactly the sampled one. The result depends only on
+    the row's seed, not on other threads or the rest of the batch.
+    """
+
+    def __init__(self, seeds: List[Optional[int]], temperature: float = 1.0, top_k: int = 40, top_p: float = 0.9):
+        self.temperature = temperature
+        self.top_k = top_k
+        self.top_p = top_p
+        self.generators = []
+        for seed in seeds:
+            if seed is None:
+                # Unseeded rows in a seeded batch still get an independent stream
+                seed = int.from_bytes(os.urandom(8), "little")
+            self.generators.append(torch.Generator().manual_seed(seed))
+
+    def __call__(self, input_ids, scores):
+        scores = scores / self.temperature
+        if self.top_k:
+            kth = torch.topk(scores, min(self.top_k, scores.shape[-1])).values[..., -1, None]
+            scores = scores.masked_fill(scores < kth, float("-inf"))
+        if self.top_p < 1.0:
+            sorted_scores, sorted_idx = torch.sort(scores, descending=True)
+            cumulative = sorted_scores.softmax(dim=-1).cumsum(dim=-1)
+            # Drop tokens once the ones before them already cover top_p
+            remove = cumulative - sorted_scores.softmax(dim=-1) >= self.top_p
+            scores = scores.masked_fill(remove.scatter(1, sorted_idx, remove), float("-inf"))
+        probs = scores.softmax(dim=-1)
+        tokens = torch.cat([
+            torch.multinomial(probs[row:row + 1], 1, generator=generator)
+            for row, generator in enumerate(self.generators)
+        ])
+        picked = torch.full_like(scores, float("-inf"))
+        return picked.scatter(1, tokens, 0.0)
+
+
+def _conv1d_to_linear(model):
+    """Swap GPT-2's Conv1D projections for equivalent nn.Linear layers.
+
+    GPT-2 implements its attention/MLP projections with transformers' Conv1D
+    (weight stored as in x out), which dynamic quantization does not touch.
+    """
+    from transformers.pytorch_utils import Conv1D
+
+    for module in list(model.modules()):
+        for child_name, child in list(module.named_children()):
+            if isinstance(child, Conv1D):
+                n_in, n_out = child.weight.shape
+                linear = torch.nn.Linear(n_in, n_out)
+                linear.weight.data = child.weight.data.t().contiguous()
+                linear.bias.data = child.bias.data
+                setattr(module, child_name, linear)
+    return model
+
+
+def quantize_for_cpu(model):
+    """Apply dynamic int8 quantization to every linear layer of `model`."""
+    quantization = getattr(torch, "ao", torch).quantization
+    model = _conv1d_to_linear(model)
+    return quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def configure_threads(num_threads: Optional[int] = None, interop_threads: Optional[int] = None) -> None:
+    """Set torch's intra-op / inter-op thread counts for this worker process.
+
+    Inter-op threads can only be set before torch runs any parallel work, so a
+    late call is reported and ignored.
+    """
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    if interop_threads:
+        try:
+            torch.set_interop_threads(interop_threads)
+        except RuntimeError as e:
+            print(f"Warning: could not set inter-op threads: {e}")
+
+
+class InferenceBackend(ABC):
+    """Interface for the engines behind LLMGenerator.
+
+    A backend loads a causal LM and its tokenizer, then generates text for one
+    prompt, a batch of prompts, or as a stream of text chunks. Results include
+    the prompt, except for `generate_stream` which yields only new text.
+    A `seed` (or one per prompt in `seeds`) makes sampling reproducible.
+    """
+
+    name = "base"
+    tokenizer = None
+
+    @abstractmethod
+    def load(self, model_name: str) -> None:
+        """Load the tokenizer and model for `model_name`."""
+
+    @abstractmethod
+    def generate(self, prompt: str, max_length: int = 150, temperature: float = 1.0, max_new_tokens: Optional[int] = None,
+                 prefix: Optional[str] = None, max_sentences: Optional[int] = None, do_sample: bool = True,
+                 seed: Optional[int] = None) -> str:
+        """Continuation of `prompt`, including the prompt."""
+
+    @abstractmethod
+    def generate_batch(self, prompts: List[str], max_new_tokens: int = 50, temperature: float = 1.0,
+                       max_sentences: Optional[int] = None, do_sample: bool = True,
+                       seeds: Optional[List[Optional[int]]] = None) -> List[str]:
+        """Continuations of `prompts`, in the same order and including each prompt."""
+
+    @abstractmethod
+    def generate_stream(self, prompt: str, max_new_tokens: int = 50, temperature: float = 1.0, prefix: Optional[str] = None,
+                        max_sentences: Optional[int] = None, do_sample: bool = True,
+                        seed: Optional[int] = None) -> Iterator[str]:
+        """Yield the new text of the continuation of `prompt` as it is generated."""
+
+
+class TorchBackend(InferenceBackend):
+    """PyTorch eager-mode backend using AutoModelForCausalLM.
+
+    - prefix_cache_size: entries in the prompt-prefix KV cache (0 disables it)
+    - optimize: quantize linear layers to int8 and run under
+      torch.inference_mode() for more stories per core
+    - num_threads / interop_threads: torch thread counts for this worker
+    - snapshot_root / revision: where to look for a pinned local snapshot
+      (see model_loading); when one is found the model is loaded offline with
+      memory-mapped weights, otherwise (or if the snapshot fails to load)
+      through the hub as before
+    """
+
+    name = "torch"
+
+    def __init__(
+        self,
+        prefix_cache_size: int = 64,
+        optimize: bool = False,
+        num_threads: Optional[int] = None,
+        interop_threads: Optional[int] = None,
+        snapshot_root: Optional[str] = None,
+        revision: Optional[str] = None,
+    ):
         if AutoTokenizer is None:
             raise RuntimeError("transformers package not available. Install requirements.txt to use LLMGenerator")
-        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
-        self.model = AutoModelForCausalLM.from_pretrained(model_name)
+        configure_threads(num_threads, interop_threads)
+        self.optimize = optimize
+        self.snapshot_root = snapshot_root
+        self.revision = revision
+        self.snapshot = None
+        self.model = None
+        # LRU of prompt prefix -> (prefix token ids, past_key_values)
+        self.prefix_cache_size = prefix_cache_size
+        self._prefix_cache: "OrderedDict[str, tuple]" = OrderedDict()
+        self._prefix_lock = threading.Lock()
 
-    def generate(self, prompt: str, max_length: int = 150, temperature: float = 1.0) -> str:
-        inputs = self.tokenizer(prompt, return_tensors="pt")
-        outputs = self.model.generate(
-            **inputs,
-            max_length=max_length,
-            do_sample=True,
-            temperature=temperature,
-            top_k=40,  # Reduced for faster generation
-            top_p=0.9,  # Slightly reduced for speed
-            pad_token_id=self.tokenizer.eos_token_id,
-            num_beams=1,  # Use greedy search for speed
-            early_stopping=True,
-        )
+    def _load_model(self, source: str, local: bool = False):
+        if local:
+            model = load_model_mmap(source)
+        else:
+            model = AutoModelForCausalLM.from_pretrained(source)
+        model.eval()
+        if self.optimize:
+            model = quantize_for_cpu(model)
+        return model
+
+    def load(self, model_name: str) -> None:
+        self.model_name = model_name
+        # Offline-first: use a pinned local snapshot when there is one
+        self.snapshot = resolve_snapshot(model_name, self.snapshot_root, self.revision)
+        if self.snapshot:
+            try:
+                self.tokenizer = load_tokenizer_offline(self.snapshot)
+                self.model = self._load_model(self.snapshot, local=True)
+            except Exception as e:
+                # An incomplete or corrupt snapshot must not stop the model from loading
+                print(f"Warning: could not load {model_name!r} from snapshot {self.snapshot}: {e}. Using the hub.")
+                self.snapshot = None
+        if not self.snapshot:
+            self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+            self.model = self._load_model(model_name)
+        # GPT-2 has no pad token; batched prompts are left-padded with EOS so
+        # every prompt ends right where generation starts
+        if self.tokenizer.pad_token is None:
+            self.tokenizer.pad_token = self.tokenizer.eos_token
+        self.tokenizer.padding_side = "left"
+
+    def _inference_context(self):
+        return torch.inference_mode() if self.optimize else torch.no_grad()
+
+    def _prefix_state(self, prefix: str):
+        """Return (token ids, past_key_values) for `prefix`, computing it once.
+
+        The cache covers every prefix token except the last one: generate()
+        needs at least one uncached input token to start decoding from.
+        """
+        with self._prefix_lock:
+            state = self._prefix_cache.get(prefix)
+            if state is not None:
+                self._prefix_cache.move_to_end(prefix)
+                return state
+
+        prefix_ids = self.tokenizer(prefix, return_tensors="pt").input_ids
+        with self._inference_context():
+            past = self.model(prefix_ids[:, :-1], use_cache=True).past_key_values
+        state = (prefix_ids, past)
+
+        with self._prefix_lock:
+            self._prefix_cache[prefix] = state
+            self._prefix_cache.move_to_end(prefix)
+            while len(self._prefix_cache) > self.prefix_cache_size:
+                self._prefix_cache.popitem(last=False)
+        return state
+
+    def _prepare_inputs(self, prompt: str, prefix: Optional[str] = None) -> Dict:
+        """Tokenize `prompt`, resuming from the cached state of `prefix` if given.
+
+        `prefix` must be the start of `prompt`. Prefix and remainder are
+        tokenized separately so the ids line up with the cached state.
+        """
+        if not prefix or not prompt.startswith(prefix) or self.prefix_cache_size <= 0:
+            return dict(self.tokenizer(prompt, return_tensors="pt"))
+
+        prefix_ids, past = self._prefix_state(prefix)
+        rest = prompt[len(prefix):]
+        if rest:
+            rest_ids = self.tokenizer(rest, return_tensors="pt").input_ids
+            input_ids = torch.cat([prefix_ids, rest_ids], dim=1)
+        else:
+            input_ids = prefix_ids
+        return {
+            "input_ids": input_ids,
+            "attention_mask": torch.ones_like(input_ids),
+            # generate() extends the cache in place, so hand it a copy
+            "past_key_values": copy.deepcopy(past),
+        }
+
+    def clear_prefix_cache(self) -> None:
+        with self._prefix_lock:
+            self._prefix_cache.clear()
+
+    def generate(
+        self,
+        prompt: str,
+        max_length: int = 150,
+        temperature: float = 1.0,
+        max_new_tokens: Optional[int] = None,
+        prefix: Optional[str] = None,
+        max_sentences: Optional[int] = None,
+        do_sample: bool = True,
+        seed: Optional[int] = None,
+    ) -> str:
+        """Generate a continuation of `prompt` (the result includes the prompt).
+
+        Pass `prefix` (the fixed start of the prompt) to reuse its cached
+        key/value state and skip re-encoding it on every call. Pass
+        `max_sentences` to stop as soon as the story is complete, and `seed`
+        for a reproducible sample.
+        """
+        length = {"max_new_tokens": max_new_tokens} if max_new_tokens is not None else {"max_length": max_length}
+        with self._inference_context():
+            inputs = self._prepare_inputs(prompt, prefix)
+            outputs = self.model.generate(
+                **inputs,
+                **length,
+                stopping_criteria=self._stopping_criteria([prompt], inputs, max_sentences),
+                **self._sampling_kwargs(temperature, do_sample, [seed]),
+            )
         text = self.tokenizer.decode(outputs[0], skip_special_tokens=True)
         return text
+
+    def _sampling_kwargs(self, temperature: float, do_sample: bool, seeds: Optional[List[Optional[int]]] = None) -> Dict:
+        """Decoding settings shared by every generation path."""
+        kwargs = dict(
+            do_sample=do_sample,
+            pad_token_id=self.tokenizer.pad_token_id,
+            num_beams=1,  # No beam search, for speed
+        )
+        if do_sample and seeds and any(seed is not None for seed in seeds):
+            # Sample with per-row generators instead of torch's global RNG
+            kwargs.update(
+                do_sample=False,
+                logits_processor=LogitsProcessorList([SeededSampler(seeds, temperature, top_k=40, top_p=0.9)]),
+            )
+        elif do_sample:
+            kwargs.update(
+                temperature=temperature,
+                top_k=40,  # Reduced for faster generation
+                top_p=0.9,  # Slightly reduced for speed
+            )
+        return kwargs
+
+    def _stopping_criteria(self, prompts: List[str], inputs: Dict, max_sentences: Optional[int]):
+        if not max_sentences:
+            return None
+        prompt_length = inputs["input_ids"].shape[1]
+        return StoppingCriteriaList([StoryStoppingCriteria(self.tokenizer, prompts, prompt_length, max_sentences)])
+
+    def generate_batch(self, prompts: List[str], max_new_tokens: int = 50, temperature: float = 1.0,
+                       max_sentences: Optional[int] = None, do_sample: bool = True,
+                       seeds: Optional[List[Optional[int]]] = None) -> List[str]:
+        """Generate continuations for several prompts in one `model.generate` call.
+
+        Prompts are left-padded to a common length; results come back in the
+        same order as `prompts` and, like `generate`, include the prompt text.
+        `seeds` gives an optional seed per prompt.
+        """
+        if not prompts:
+            return []
+        prompts = list(prompts)
+        inputs = self.tokenizer(prompts, return_tensors="pt", padding=True)
+        with self._inference_context():
+            outputs = self.model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                stopping_criteria=self._stopping_criteria(prompts, inputs, max_sentences),
+                **self._sampling_kwargs(temperature, do_sample, seeds),
+            )
+        return self.tokenizer.batch_decode(outputs, skip_special_tokens=True)
+
+    def generate_stream(
+        self,
+        prompt: str,
+        max_new_tokens: int = 50,
+        temperature: float = 1.0,
+        prefix: Optional[str] = None,
+        max_sentences: Optional[int] = None,
+        do_sample: bool = True,
+        seed: Optional[int] = None,
+    ) -> Iterator[str]:
+        """Yield newly generated text as tokens are produced.
+
+        Only the continuation is yielded (not the prompt). Generation runs on a
+        background thread and the streamer hands decoded text back here.
+        """
+        with self._inference_context():
+            inputs = self._prepare_inputs(prompt, prefix)
+        streamer = TextIteratorStreamer(self.tokenizer, skip_prompt=True, skip_special_tokens=True)
+        kwargs = dict(
+            **inputs,
+            max_new_tokens=max_new_tokens,
+            stopping_criteria=self._stopping_criteria([prompt], inputs, max_sentences),
+            streamer=streamer,
+            **self._sampling_kwargs(temperature, do_sample, [seed]),
+        )
+        errors = []
+
+        def _run():
+            try:
+                # Grad/inference mode is thread-local, so enter it here
+                with self._inference_context():
+                    self.model.generate(**kwargs)
+            except Exception as e:
+                errors.append(e)
+                # Unblock the consumer waiting on the streamer
+                streamer.end()
+
+        thread = threading.Thread(target=_run, name="llm-stream", daemon=True)
+        thread.start()
+        try:
+            for text in streamer:
+                if text:
+                    yield text
+        finally:
+            # Also when the caller stops early: the model is free again once this returns
+            thread.join()
+        if errors:
+            raise errors[0]
+
+
+
+class OnnxBackend(TorchBackend):
+    """ONNX Runtime CPU backend.
+
+    Exports the checkpoint to ONNX with a KV cache (via `optimum`) and runs it
+    on onnxruntime's CPUExecutionProvider. It reuses the Hugging Face
+    generation loop, so batching, streaming and stopping criteria behave as in
+    TorchBackend. Requires `pip install optimum[onnxruntime]`.
+
+    The prefix KV cache and int8 quantization are torch-specific and are
+    turned off here.
+    """
+
+    name = "onnx"
+
+    def __init__(self, prefix_cache_size: int = 0, optimize: bool = False, **options):
+        if optimize:
+            print("Warning: int8 quantization is not supported by the ONNX backend; using fp32.")
+        super().__init__(prefix_cache_size=0, optimize=False, **options)
+
+    def _load_model(self, source: str, local: bool = False):
+        try:
+            from optimum.onnxruntime import ORTModelForCausalLM
+        except ImportError as e:
+            raise RuntimeError("optimum[onnxruntime] not available. Install it to use the ONNX backend") from e
+        return ORTModelForCausalLM.from_pretrained(
+            source, export=True, use_cache=True, provider="CPUExecutionProvider", local_files_only=local
+        )
+
+
+BACKENDS = {
+    "torch": TorchBackend,
+    "onnx": OnnxBackend,
+}
+
+
+class LLMGenerator:
+    """Story text generator backed by a pluggable inference engine.
+
+    `backend` picks an entry of BACKENDS ("torch" by default); extra keyword
+    options are passed to the backend (see TorchBackend).
+    """
+
+    def __init__(self, model_name: str = "gpt2", backend: str = "torch", **options):
+        if AutoTokenizer is None:
+            raise RuntimeError("transformers package not available. Install requirements.txt to use LLMGenerator")
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown LLM backend {backend!r}; choose one of {sorted(BACKENDS)}")
+        self.model_name = model_name
+        self.backend = BACKENDS[backend](**options)
+        self.backend.load(model_name)
+        self.tokenizer = self.backend.tokenizer
+
+    @property
+    def model(self):
+        return self.backend.model
+
+    def generate(self, prompt: str, max_length: int = 150, temperature: float = 1.0, **kwargs) -> str:
+        return self.backend.generate(prompt, max_length=max_length, temperature=temperature, **kwargs)
+
+    def generate_batch(self, prompts: List[str], max_new_tokens: int = 50, temperature: float = 1.0, **kwargs) -> List[str]:
+        return self.backend.generate_batch(prompts, max_new_tokens=max_new_tokens, temperature=temperature, **kwargs)
+
+    def generate_stream(self, prompt: str, max_new_tokens: int = 50, temperature: float = 1.0, **kwargs) -> Iterator[str]:
+        return self.backend.generate_stream(prompt, max_new_tokens=max_new_tokens, temperature=temperature, **kwargs)
+
+    def clear_prefix_cache(self) -> None:
+        clear = getattr(self.backend, "clear_prefix_cache", None)
+        if clear is not None:
+            clear()
+
+
+def _model_size_mb(model) -> float:
+    """Serialized size of the model weights in MB (works for quantized models)."""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.getbuffer().nbytes / (1024 * 1024)
+
+
+def compare_inference_modes(model_name: str = "gpt2", prompt: Optional[str] = None, runs: int = 3, max_new_tokens: int = 50) -> Dict:
+    """Measure latency and weight memory of the fp32 path against the int8 path.
+
+    Returns a report dict with per-mode `latency_s` (median of `runs`) and
+    `model_mb`, plus the speedup and the memory saved.
+    """
+    prompt = prompt or "Owl waves hello with a warm smile. Owl teaches that being kind and sharing makes everyone happy."
+    report: Dict = {"model": model_name, "threads": torch.get_num_threads()}
+    for mode, optimize in (("fp32", False), ("int8", True)):
+        generator = LLMGenerator(model_name=model_name, optimize=optimize, prefix_cache_size=0)
+        generator.generate(prompt, max_new_tokens=max_new_tokens)  # warm-up
+        timings = []
+        for run in range(runs):
+            start = time.perf_counter()
+            generator.generate(prompt, max_new_tokens=max_new_tokens, seed=run)
+            timings.append(time.perf_counter() - start)
+        report[mode] = {"latency_s": sorted(timings)[len(timings) // 2], "model_mb": _model_size_mb(generator.model)}
+        del generator
+    report["speedup"] = report["fp32"]["latency_s"] / report["int8"]["latency_s"]
+    report["memory_saved_mb"] = report["fp32"]["model_mb"] - report["int8"]["model_mb"]
+    return report
+
+
+def compare_backends(model_name: str = "gpt2", prompts: Optional[List[str]] = None, runs: int = 3, max_new_tokens: int = 30,
+                     backends: tuple = ("torch", "onnx")) -> Dict:
+    """Generate greedily with each backend and compare outputs and latency.
+
+    Returns per-backend `outputs` and median `latency_s`, and `outputs_match`
+    telling whether every backend produced the same texts.
+    """
+    prompts = prompts or [
+        "Owl waves hello with a warm smile. Owl teaches that",
+        "Lion waves hello with a warm smile. Lion plays games and",
+    ]
+    report: Dict = {"model": model_name}
+    for name in backends:
+        generator = LLMGenerator(model_name=model_name, backend=name)
+        generator.generate_batch(prompts, max_new_tokens=max_new_tokens, do_sample=False)  # warm-up
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            outputs = generator.generate_batch(prompts, max_new_tokens=max_new_tokens, do_sample=False)
+            timings.append(time.perf_counter() - start)
+        report[name] = {"outputs": outputs, "latency_s": sorted(timings)[len(timings) // 2]}
+        del generator
+    first = report[backends[0]]["outputs"]
+    report["outputs_match"] = all(report[name]["outputs"] == first for name in backends)
+    return report
+
+
+if __name__ == "__main__":
+    import json
+
+    print(json.dumps(compare_inference_modes(), indent=2))
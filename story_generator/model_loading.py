@@ -0,0 +1,198 @@
+"""Offline-first model loading from pinned local snapshots.
+
+`AutoModelForCausalLM.from_pretrained("gpt2")` resolves the model through the
+Hugging Face hub cache and may try the network. On air-gapped nodes we load
+from a local snapshot directory instead:
+
+- the snapshot is either `<STORY_LLM_SNAPSHOT_DIR>/<model_name>` or the
+  pinned revision in the local hub cache (`refs/main`, or an explicit
+  revision); nothing is fetched
+- weights are read from `model.safetensors` through a read-only memory map,
+  so the parameters point straight at the page cache. Worker processes on
+  the same host that load the same file share those pages instead of each
+  holding a private copy.
+
+Requires `transformers` and `torch`, like llm_generator.
+"""
+import inspect
+import json
+import mmap
+import os
+import struct
+import subprocess
+import sys
+import time
+import warnings
+from contextlib import nullcontext
+from typing import Dict, Iterable, List, Optional
+
+SAFETENSORS_FILE = "model.safetensors"
+
+
+def _hub_cache_dir() -> str:
+    if os.environ.get("HF_HUB_CACHE"):
+        return os.environ["HF_HUB_CACHE"]
+    hf_home = os.environ.get("HF_HOME", os.path.join(os.path.expanduser("~"), ".cache", "huggingface"))
+    return os.path.join(hf_home, "hub")
+
+
+def resolve_snapshot(model_name: str, snapshot_root: Optional[str] = None, revision: Optional[str] = None) -> Optional[str]:
+    """Return a local snapshot directory for `model_name`, or None.
+
+    Looks in `snapshot_root` (default: STORY_LLM_SNAPSHOT_DIR) first, then in
+    the hub cache at `revision` (default: the commit recorded in refs/main).
+    """
+    if os.path.isdir(model_name):
+        return model_name
+    snapshot_root = snapshot_root or os.environ.get("STORY_LLM_SNAPSHOT_DIR")
+    if snapshot_root:
+        candidate = os.path.join(snapshot_root, model_name)
+        if os.path.isdir(candidate):
+            return candidate
+
+    repo_dir = os.path.join(_hub_cache_dir(), "models--" + model_name.replace("/", "--"))
+    if revision is None:
+        ref = os.path.join(repo_dir, "refs", "main")
+        if not os.path.isfile(ref):
+            return None
+        with open(ref, "r", encoding="utf-8") as f:
+            revision = f.read().strip()
+    candidate = os.path.join(repo_dir, "snapshots", revision)
+    return candidate if os.path.isdir(candidate) else None
+
+
+def mmap_safetensors(path: str) -> Dict:
+    """Map a safetensors file read-only and return zero-copy tensors over it."""
+    import torch
+
+    dtypes = {
+        "F64": torch.float64, "F32": torch.float32, "F16": torch.float16, "BF16": torch.bfloat16,
+        "I64": torch.int64, "I32": torch.int32, "I16": torch.int16, "I8": torch.int8,
+        "U8": torch.uint8, "BOOL": torch.bool,
+    }
+    with open(path, "rb") as f:
+        header_len = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_len))
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    data_start = 8 + header_len
+    tensors = {}
+    with warnings.catch_warnings():
+        # frombuffer warns that the mapping is not writable; weights are only read
+        warnings.simplefilter("ignore", UserWarning)
+        for name, info in header.items():
+            if name == "__metadata__":
+                continue
+            dtype = dtypes[info["dtype"]]
+            begin, end = info["data_offsets"]
+            if end == begin:
+                tensors[name] = torch.empty(info["shape"], dtype=dtype)
+                continue
+            count = (end - begin) // torch.tensor([], dtype=dtype).element_size()
+            tensor = torch.frombuffer(mapped, dtype=dtype, count=count, offset=data_start + begin)
+            tensors[name] = tensor.reshape(info["shape"])
+    return tensors
+
+
+def _supports_assign() -> bool:
+    """Whether `load_state_dict` can adopt tensors as they are (torch>=2.1)."""
+    import torch
+
+    return "assign" in inspect.signature(torch.nn.Module.load_state_dict).parameters
+
+
+def _unloaded_parameters(model, missing_keys: Iterable[str]) -> List[str]:
+    """The parameters among `missing_keys`, which would be left uninitialized.
+
+    Tied weights (GPT-2's lm_head.weight) share the tensor they are tied to,
+    so named_parameters() does not list them; buffers are computed by the
+    model itself. Neither counts.
+    """
+    parameters = {name for name, _ in model.named_parameters()}
+    return sorted(set(missing_keys) & parameters)
+
+
+def load_model_mmap(snapshot: str):
+    """Build the model from the snapshot config and point it at mmap'd weights.
+
+    Falls back to a regular local `from_pretrained` when the snapshot has no
+    safetensors file, or when torch is too old to adopt the mapped tensors.
+    Raises RuntimeError if the file lacks weights for any parameter.
+    """
+    from transformers import AutoConfig, AutoModelForCausalLM
+
+    weights = os.path.join(snapshot, SAFETENSORS_FILE)
+    if not os.path.isfile(weights) or not _supports_assign():
+        return AutoModelForCausalLM.from_pretrained(snapshot, local_files_only=True)
+
+    try:
+        from transformers.modeling_utils import no_init_weights
+    except ImportError:
+        no_init_weights = nullcontext
+
+    config = AutoConfig.from_pretrained(snapshot, local_files_only=True)
+    # Skip random initialization: every parameter is replaced below
+    with no_init_weights():
+        model = AutoModelForCausalLM.from_config(config)
+
+    expected = set(model.state_dict())
+    prefix = getattr(model, "base_model_prefix", "")
+    state = {}
+    for name, tensor in mmap_safetensors(weights).items():
+        # Base-model checkpoints (like gpt2) store keys without the head prefix
+        if name not in expected and prefix and f"{prefix}.{name}" in expected:
+            name = f"{prefix}.{name}"
+        if name in expected:
+            state[name] = tensor
+    # assign=True keeps the mmap'd tensors instead of copying into fresh ones
+    result = model.load_state_dict(state, strict=False, assign=True)
+    model.tie_weights()
+    missing = _unloaded_parameters(model, result.missing_keys)
+    if missing:
+        raise RuntimeError(f"{weights} has no weights for {', '.join(missing)}")
+    model.eval()
+    return model
+
+
+def load_tokenizer_offline(snapshot: str):
+    from transformers import AutoTokenizer
+
+    return AutoTokenizer.from_pretrained(snapshot, local_files_only=True)
+
+
+_TIMING_SNIPPETS = {
+    "hub": (
+        "from transformers import AutoModelForCausalLM; "
+        "AutoModelForCausalLM.from_pretrained({model!r})"
+    ),
+    "snapshot_mmap": (
+        "from story_generator.model_loading import load_model_mmap, resolve_snapshot; "
+        "load_model_mmap(resolve_snapshot({model!r}))"
+    ),
+}
+
+
+def compare_cold_start(model_name: str = "gpt2", runs: int = 3) -> Dict:
+    """Time the hub loader against the mmap snapshot loader.
+
+    Each load runs in a fresh interpreter (imports included) so the numbers
+    reflect a worker cold start. Reports the median seconds per loader.
+    """
+    if resolve_snapshot(model_name) is None:
+        raise RuntimeError(f"No local snapshot found for {model_name!r}")
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    report: Dict = {"model": model_name}
+    for name, snippet in _TIMING_SNIPPETS.items():
+        code = "import time; t = time.perf_counter(); " + snippet.format(model=model_name) + "; print(time.perf_counter() - t)"
+        timings = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+            timings.append({"load_s": float(out.stdout.strip().splitlines()[-1]), "process_s": time.perf_counter() - start})
+        timings.sort(key=lambda t: t["load_s"])
+        report[name] = timings[len(timings) // 2]
+    return report
+
+
+if __name__ == "__main__":
+    print(json.dumps(compare_cold_start(*sys.argv[1:2]), indent=2))
@@ -0,0 +1,120 @@
+"""Process-wide registry of loaded LLM generators.
+
+Loading GPT-2 (tokenizer + weights) takes seconds and hundreds of MB, so each
+model name is loaded once per process and shared by every Streamlit session.
+Models that have not been used for a while can be unloaded to free memory.
+
+Load options for new generators (see `LLMGenerator`) come from `configure()`
+or, by default, from the environment:
+
+- STORY_LLM_OPTIMIZE=1: int8 dynamic quantization + inference mode
+- STORY_LLM_THREADS / STORY_LLM_INTEROP_THREADS: torch thread counts per worker
+- STORY_LLM_BACKEND: inference backend, "torch" (default) or "onnx"
+- STORY_LLM_SNAPSHOT_DIR: root of pinned local snapshots, read by
+  model_loading.resolve_snapshot (`<root>/<model_name>`)
+"""
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+_lock = threading.Lock()
+_generators: Dict[str, object] = {}
+_last_used: Dict[str, float] = {}
+# One lock per model name so that loading gpt2 does not block other models
+_load_locks: Dict[str, threading.Lock] = {}
+
+
+def _options_from_env() -> Dict[str, Any]:
+    options: Dict[str, Any] = {}
+    if os.environ.get("STORY_LLM_BACKEND"):
+        options["backend"] = os.environ["STORY_LLM_BACKEND"]
+    if os.environ.get("STORY_LLM_OPTIMIZE", "").lower() in ("1", "true", "yes"):
+        options["optimize"] = True
+    for env, key in (("STORY_LLM_THREADS", "num_threads"), ("STORY_LLM_INTEROP_THREADS", "interop_threads")):
+        if os.environ.get(env):
+            options[key] = int(os.environ[env])
+    return options
+
+
+_options: Dict[str, Any] = _options_from_env()
+
+
+def configure(**options) -> None:
+    """Set LLMGenerator options for models loaded from now on.
+
+    Already loaded models keep their settings; `unload` them to reload.
+    """
+    with _lock:
+        _options.update(options)
+
+
+def get_generator(model_name: str = "gpt2"):
+    """Return the shared LLMGenerator for `model_name`, loading it on first use.
+
+    Concurrent callers asking for the same model wait for a single load.
+    """
+    with _lock:
+        generator = _generators.get(model_name)
+        if generator is not None:
+            _last_used[model_name] = time.monotonic()
+            return generator
+        load_lock = _load_locks.setdefault(model_name, threading.Lock())
+
+    with load_lock:
+        # Another thread may have finished loading while we waited
+        with _lock:
+            generator = _generators.get(model_name)
+            if generator is not None:
+                _last_used[model_name] = time.monotonic()
+                return generator
+
+        from .llm_generator import LLMGenerator
+
+        with _lock:
+            options = dict(_options)
+        generator = LLMGenerator(model_name=model_name, **options)
+        with _lock:
+            _generators[model_name] = generator
+            _last_used[model_name] = time.monotonic()
+        return generator
+
+
+def loaded_models() -> List[str]:
+    """Names of the models currently held in memory."""
+    with _lock:
+        return list(_generators)
+
+
+def unload(model_name: str) -> bool:
+    """Drop the shared generator for `model_name`. Returns True if one was loaded."""
+    with _lock:
+        _last_used.pop(model_name, None)
+        return _generators.pop(model_name, None) is not None
+
+
+def unload_idle(max_idle_seconds: float, now: Optional[float] = None) -> List[str]:
+    """Unload every model that has not been used for `max_idle_seconds`.
+
+    Returns the names of the models that were unloaded.
+    """
+    now = time.monotonic() if now is None else now
+    with _lock:
+        idle = [name for name, used in _last_used.items() if now - used >= max_idle_seconds]
+        for name in idle:
+            _generators.pop(name, None)
+            _last_used.pop(name, None)
+    return idle
+
+
+def start_idle_reaper(max_idle_seconds: float = 900.0, interval: float = 60.0) -> threading.Thread:
+    """Start a daemon thread that periodically calls `unload_idle`."""
+
+    def _reap():
+        while True:
+            time.sleep(interval)
+            unload_idle(max_idle_seconds)
+
+    thread = threading.Thread(target=_reap, name="llm-idle-reaper", daemon=True)
+    thread.start()
+    return thread
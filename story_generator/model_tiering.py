@@ -0,0 +1,157 @@
+"""Pick the best LLM checkpoint that fits a per-story latency budget.
+
+Candidates are ranked from highest quality to fastest, e.g.
+("gpt2", "distilgpt2", "sshleifer/tiny-gpt2"). The selector benchmarks them
+top-down on the real story scaffold and serves the first one whose story
+latency fits the budget (or the fastest measured if none does). Benchmarks are
+repeated every `interval` seconds, so a quieter host moves back up a tier.
+Between benchmarks, live story latencies are reported through `observe`; when
+the median of recent stories from the current model goes over budget (the
+host got busy) the selector steps down one tier right away.
+
+Models rejected by a benchmark are unloaded from the registry again so only
+the serving model stays in memory.
+"""
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Optional, Sequence
+
+from . import model_registry
+from .batch_scheduler import get_scheduler
+
+DEFAULT_TIERS = ("gpt2", "distilgpt2", "sshleifer/tiny-gpt2")
+
+
+def benchmark_story(model_name: str, prompt: str, max_new_tokens: int = 50, max_sentences: Optional[int] = None,
+                    prefix: Optional[str] = None, runs: int = 2) -> float:
+    """Median seconds to continue `prompt` with `model_name` (after one warm-up run).
+
+    Runs go through the shared scheduler like live stories, so the model is
+    never used by two threads at once and the timings include queueing.
+    """
+    # Load the candidate here rather than on the scheduler's worker
+    model_registry.get_generator(model_name)
+    timings = []
+    for i in range(runs + 1):
+        start = time.perf_counter()
+        # A fixed seed makes every candidate (and every re-benchmark) decode the same way
+        get_scheduler().submit(prompt, model_name=model_name, max_new_tokens=max_new_tokens, temperature=0.7,
+                               prefix=prefix, max_sentences=max_sentences, seed=i).result()
+        if i:
+            # The first run pays for lazy allocations and thread pool start-up
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+class ModelTierSelector:
+    """Choose among ranked candidate models by measured latency.
+
+    - candidates: model names, highest quality first
+    - latency_budget: seconds one story may take
+    - benchmark_fn(model_name) -> seconds for one story
+    - interval: seconds between background re-benchmarks
+    - window: live latencies kept per model for step-down decisions
+    """
+
+    def __init__(
+        self,
+        candidates: Sequence[str],
+        latency_budget: float,
+        benchmark_fn: Callable[[str], float],
+        interval: float = 600.0,
+        window: int = 10,
+    ):
+        if not candidates:
+            raise ValueError("At least one candidate model is required")
+        self.candidates = list(candidates)
+        self.latency_budget = latency_budget
+        self.interval = interval
+        self._benchmark_fn = benchmark_fn
+        self._window = window
+        self._lock = threading.Lock()
+        self._benchmark_lock = threading.Lock()
+        self._current = 0
+        self._recent: Deque[float] = deque(maxlen=window)
+        self._last_benchmark: Dict[str, float] = {}
+        self._step_downs = 0
+        self._stopped = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+
+    @property
+    def current(self) -> str:
+        """The model stories should use now."""
+        with self._lock:
+            return self.candidates[self._current]
+
+    def benchmark(self) -> str:
+        """Benchmark top-down, switch to the first model within budget and return it."""
+        with self._benchmark_lock:
+            timings: Dict[str, float] = {}
+            chosen = None
+            for i, name in enumerate(self.candidates):
+                try:
+                    timings[name] = self._benchmark_fn(name)
+                except Exception as e:
+                    print(f"Could not benchmark {name}: {e}")
+                    continue
+                if timings[name] <= self.latency_budget:
+                    chosen = i
+                    break
+            if chosen is None:
+                if not timings:
+                    # Nothing could be measured; keep serving the current model
+                    return self.current
+                # Nothing fits the budget: serve the fastest model measured
+                chosen = self.candidates.index(min(timings, key=timings.get))
+
+            with self._lock:
+                self._current = chosen
+                self._recent.clear()
+                self._last_benchmark = timings
+            # Also tiers loaded since the last benchmark (after a step-down)
+            for name in self.candidates:
+                if name != self.candidates[chosen]:
+                    model_registry.unload(name)
+            return self.candidates[chosen]
+
+    def observe(self, model_name: str, latency: float) -> None:
+        """Report the latency of one story; may step down a tier."""
+        with self._lock:
+            if model_name != self.candidates[self._current]:
+                # A story started before the last switch
+                return
+            self._recent.append(latency)
+            if len(self._recent) < self._window or self._current == len(self.candidates) - 1:
+                return
+            if statistics.median(self._recent) > self.latency_budget:
+                self._current += 1
+                self._step_downs += 1
+                self._recent.clear()
+                print(f"Story latency over budget with {model_name}; switching to {self.candidates[self._current]}")
+
+    def start(self) -> "ModelTierSelector":
+        """Benchmark now (in the background) and again every `interval` seconds."""
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="model-tiering", daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self) -> None:
+        self._stopped.set()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {
+                "current": self.candidates[self._current],
+                "latency_budget": self.latency_budget,
+                "benchmark": dict(self._last_benchmark),
+                "recent_median": statistics.median(self._recent) if self._recent else 0.0,
+                "step_downs": self._step_downs,
+            }
+
+    def _run(self) -> None:
+        while not self._stopped.is_set():
+            self.benchmark()
+            self._stopped.wait(self.interval)
@@ -0,0 +1,150 @@
+"""Pre-fork launcher: load the model once, then fork the app workers.
+
+Running several Streamlit processes per host normally means each of them
+loads its own GPT-2. In pre-fork mode the parent loads the model into the
+process-wide registry (see model_registry), freezes the garbage collector so
+later collections do not write to the shared objects, and then forks the
+workers. Each child finds the model already in the registry and shares the
+weight pages with the parent copy-on-write. Only pages a worker writes to
+become private.
+
+    python -m story_generator.prefork --workers 4 --port 8501 app.py
+
+Worker i serves on port `port + i`; put a load balancer in front of them.
+POSIX only (uses os.fork).
+
+The parent does not run a warm-up generation before forking: the torch/OpenMP
+thread pools are not fork-safe once they have been started, so each worker
+starts its own on first use.
+"""
+import argparse
+import gc
+import json
+import os
+import signal
+import sys
+import time
+from typing import Dict, List, Optional
+
+from .model_registry import get_generator
+
+
+def _smaps_rollup(pid: int) -> Dict[str, float]:
+    """Rss/Pss/shared/private memory of a process in MB (Linux)."""
+    fields = {"Rss": "rss_mb", "Pss": "pss_mb", "Shared_Clean": "shared_mb", "Shared_Dirty": "shared_mb",
+              "Private_Clean": "private_mb", "Private_Dirty": "private_mb"}
+    usage = {name: 0.0 for name in fields.values()}
+    with open(f"/proc/{pid}/smaps_rollup", "r", encoding="utf-8") as f:
+        for line in f:
+            key, _, rest = line.partition(":")
+            if key in fields:
+                usage[fields[key]] += int(rest.split()[0]) / 1024
+    return usage
+
+
+def memory_report(pids: List[int]) -> Dict:
+    """Per-process memory for `pids` plus the total proportional set size.
+
+    Pss splits shared pages between the processes that map them, so the sum
+    of Pss is what the group really costs; Rss counts shared weights in every
+    worker.
+    """
+    processes = {}
+    for pid in pids:
+        try:
+            processes[pid] = _smaps_rollup(pid)
+        except OSError:
+            continue
+    return {
+        "processes": processes,
+        "total_pss_mb": sum(p["pss_mb"] for p in processes.values()),
+        "total_rss_mb": sum(p["rss_mb"] for p in processes.values()),
+    }
+
+
+def preload(model_name: str = "gpt2"):
+    """Load `model_name` into the registry and freeze it for sharing."""
+    generator = get_generator(model_name)
+    gc.collect()
+    # Move everything allocated so far out of the collector's reach: a gc pass
+    # in a worker would otherwise touch (and un-share) every tracked object
+    gc.freeze()
+    return generator
+
+
+def _run_worker(script: str, port: int, script_args: List[str]) -> None:
+    from streamlit.web import bootstrap
+
+    flag_options = {"server.port": port, "server.headless": True}
+    # Streamlit reads its config once in the worker; options must be set first
+    bootstrap.load_config_options(flag_options=flag_options)
+    bootstrap.run(script, False, script_args, flag_options)
+
+
+def fork_workers(script: str, workers: int, port: int = 8501, script_args: Optional[List[str]] = None) -> List[int]:
+    """Fork `workers` Streamlit processes serving `script` on consecutive ports."""
+    pids = []
+    for i in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(script, port + i, list(script_args or []))
+            except BaseException as e:
+                print(f"Worker on port {port + i} failed: {e}", file=sys.stderr)
+                code = 1
+            finally:
+                os._exit(code)
+        pids.append(pid)
+    return pids
+
+
+def serve(script: str, workers: int, port: int = 8501, model_name: str = "gpt2",
+          report_interval: float = 0.0, script_args: Optional[List[str]] = None) -> int:
+    """Preload the model, fork the workers and wait for them.
+
+    SIGTERM/SIGINT are forwarded to the workers. With `report_interval` set,
+    a memory_report for the parent and workers is printed periodically.
+    """
+    preload(model_name)
+    pids = fork_workers(script, workers, port, script_args)
+    print(f"Pre-fork: {model_name} loaded in {os.getpid()}, workers {pids} on ports {port}-{port + workers - 1}")
+
+    def _forward(signum, _frame):
+        for pid in pids:
+            try:
+                os.kill(pid, signum)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, _forward)
+    signal.signal(signal.SIGINT, _forward)
+
+    alive = set(pids)
+    last_report = time.monotonic()
+    while alive:
+        pid, _ = os.waitpid(-1, os.WNOHANG)
+        if pid:
+            alive.discard(pid)
+            continue
+        if report_interval and time.monotonic() - last_report >= report_interval:
+            print(json.dumps(memory_report([os.getpid(), *sorted(alive)]), indent=2))
+            last_report = time.monotonic()
+        time.sleep(0.5)
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load the story model once and fork Streamlit workers.")
+    parser.add_argument("script", nargs="?", default="app.py")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--port", type=int, default=8501, help="port of the first worker")
+    parser.add_argument("--model", default="gpt2")
+    parser.add_argument("--report-interval", type=float, default=0.0,
+                        help="print worker memory every N seconds (0: off)")
+    args, script_args = parser.parse_known_args(argv)
+    return serve(args.script, args.workers, args.port, args.model, args.report_interval, script_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""Bounded cache of generated stories.
+
+Stories are cached under their generation parameters (whitespace-stripped,
+case preserved: the prompt and animal appear verbatim in the story). Each key
+holds up to `variety` distinct variants: until a key has that many, callers
+generate a fresh story and add it; after that a random cached variant is
+served. Keys are evicted least-recently-used beyond `max_entries`, and each
+variant expires `ttl_seconds` after it was generated.
+
+Stories for a named child are stored with a name slot (see
+template_generator.NAME_SLOT), so one cached story serves every child.
+"""
+import random
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+def cache_key(prompt: str = "", child_name: Optional[str] = None, favorite_animal: Optional[str] = None,
+              voice_friendly: bool = False, use_llm: bool = True, llm_mode: str = "full", seed: Optional[int] = None) -> Tuple:
+    """Turn generation parameters into a cache key.
+
+    Prompt and animal are only stripped, not lowercased, because both are
+    written into the story as given. Only whether a name is given matters,
+    not the name itself. Seeded requests get their own key per seed.
+    """
+    return (
+        (prompt or "").strip(),
+        bool(child_name and child_name.strip()),
+        (favorite_animal or "").strip(),
+        bool(voice_friendly),
+        bool(use_llm),
+        llm_mode if use_llm else "",
+        seed,
+    )
+
+
+class StoryCache:
+    def __init__(self, max_entries: int = 512, ttl_seconds: float = 3600.0, variety: int = 8):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.variety = variety
+        self._entries: "OrderedDict[Hashable, List[Tuple[Any, float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._rng = random.Random()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.variety > 0
+
+    def get(self, key: Hashable, now: Optional[float] = None, variety: Optional[int] = None) -> Optional[Any]:
+        """Return a cached variant, or None while the key needs more variants.
+
+        `variety` overrides the number of variants needed for this key (1 for
+        deterministic, seeded stories).
+        """
+        now = time.monotonic() if now is None else now
+        variety = self.variety if variety is None else variety
+        with self._lock:
+            variants = self._entries.get(key)
+            if variants is not None:
+                variants[:] = [(story, created) for story, created in variants if now - created < self.ttl_seconds]
+                self._entries.move_to_end(key)
+            if not variants or len(variants) < variety:
+                self._misses += 1
+                return None
+            self._hits += 1
+            return self._rng.choice(variants)[0]
+
+    def put(self, key: Hashable, story: Any, now: Optional[float] = None) -> None:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            variants = self._entries.setdefault(key, [])
+            self._entries.move_to_end(key)
+            if len(variants) < self.variety:
+                variants.append((story, now))
+            else:
+                # Replace the oldest variant to keep the set fresh
+                oldest = min(range(len(variants)), key=lambda i: variants[i][1])
+                variants[oldest] = (story, now)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "keys": len(self._entries),
+                "variants": sum(len(v) for v in self._entries.values()),
+                "hits": self._hits,
+                "misses": self._misses,
+            }
@@ -0,0 +1,123 @@
+"""Background pool of ready-to-serve LLM stories.
+
+Generic LLM stories depend only on the character and on whether the child's
+name is used, so they can be written ahead of time. A daemon thread keeps a
+small ready-queue per (animal, personalized) key and tops it up while the CPU
+is idle; a "Generate story" click then takes a finished story from the pool.
+Personalized stories are generated with a name slot that is filled in at
+serve time.
+"""
+import os
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+
+PoolKey = Tuple[str, bool]
+
+
+def cpu_is_idle(max_load_per_cpu: float = 0.75) -> bool:
+    """True when the 1-minute load average leaves room for background work."""
+    try:
+        load = os.getloadavg()[0]
+    except (AttributeError, OSError):
+        # No load average on this platform; assume we may run
+        return True
+    return load < max_load_per_cpu * (os.cpu_count() or 1)
+
+
+class StoryPool:
+    """Keep up to `depth` pre-generated stories for every key.
+
+    - generate_fn(animal, personalized) -> story text
+    - keys: the (animal, personalized) pairs to keep stocked
+    - is_idle: called before each background generation; the worker backs
+      off for `idle_poll` seconds while it returns False
+    """
+
+    def __init__(
+        self,
+        generate_fn: Callable[[str, bool], str],
+        keys: Iterable[PoolKey],
+        depth: int = 2,
+        is_idle: Optional[Callable[[], bool]] = None,
+        idle_poll: float = 0.5,
+    ):
+        self._generate_fn = generate_fn
+        self.depth = depth
+        self._is_idle = is_idle or cpu_is_idle
+        self._idle_poll = idle_poll
+        self._ready: Dict[PoolKey, Deque[str]] = {key: deque() for key in keys}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._hits = 0
+        self._misses = 0
+        self._generated = 0
+        self._errors = 0
+        self._worker: Optional[threading.Thread] = None
+
+    def start(self) -> "StoryPool":
+        if self._worker is None:
+            self._worker = threading.Thread(target=self._run, name="story-pool", daemon=True)
+            self._worker.start()
+        return self
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def take(self, animal: str, personalized: bool = False) -> Optional[str]:
+        """Pop a ready story for the key, or None if the pool has none yet."""
+        with self._cond:
+            ready = self._ready.get((animal, personalized))
+            if not ready:
+                self._misses += 1
+                return None
+            self._hits += 1
+            # Wake the worker to refill what we just took
+            self._cond.notify()
+            return ready.popleft()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "ready": sum(len(q) for q in self._ready.values()),
+                "hits": self._hits,
+                "misses": self._misses,
+                "generated": self._generated,
+                "errors": self._errors,
+            }
+
+    def _emptiest_key(self) -> Optional[PoolKey]:
+        key, ready = min(self._ready.items(), key=lambda item: len(item[1]), default=(None, None))
+        if key is None or len(ready) >= self.depth:
+            return None
+        return key
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped and self._emptiest_key() is None:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                key = self._emptiest_key()
+
+            if not self._is_idle():
+                time.sleep(self._idle_poll)
+                continue
+
+            try:
+                story = self._generate_fn(*key)
+            except Exception as e:
+                print(f"Story pool could not generate a story for {key}: {e}")
+                with self._cond:
+                    self._errors += 1
+                time.sleep(self._idle_poll)
+                continue
+
+            with self._cond:
+                self._generated += 1
+                if len(self._ready[key]) < self.depth:
+                    self._ready[key].append(story)
@@ -1,13 +1,22 @@
+import importlib.util
 import random
-from typing import Optional
+import re
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import NamedTuple, Optional
 
-# Try to import LLM generator - gracefully handle if dependencies missing
-try:
-    from .llm_generator import LLMGenerator
-    LLM_AVAILABLE = True
-except (ImportError, RuntimeError) as e:
-    LLMGenerator = None
-    LLM_AVAILABLE = False
+# Detect the LLM dependencies without importing them: transformers and torch
+# take seconds and hundreds of MB to import, and template-only use never needs
+# them. The LLM backend is imported on first LLM use (via model_registry).
+LLM_AVAILABLE = all(importlib.util.find_spec(dep) is not None for dep in ("transformers", "torch"))
+
+from .animal_matcher import AnimalMatcher
+from .batch_scheduler import get_scheduler
+from .circuit_breaker import CLOSED, LLMCircuitBreaker, LLMLoadShed
+from .model_tiering import DEFAULT_TIERS, ModelTierSelector, benchmark_story
+from .story_cache import StoryCache, cache_key
+from .story_pool import StoryPool, cpu_is_idle
 
 CHARACTERS = [
     "Lion",
@@ -37,6 +46,9 @@ CHARACTERS = [
     "Deer",
 ]
 
+# Finds CHARACTERS in prompts, favorite animals and generated stories
+ANIMAL_MATCHER = AnimalMatcher(CHARACTERS)
+
 # Small emoji map to show alongside animals
 EMOJI = {
     "Lion": "🦁",
@@ -174,6 +186,12 @@ FUN_ACTIONS = {
 # Final farewell appended to every story (default)
 FAREWELL = "Goodnight — sweet dreams."
 
+# Most sentences _clean_generated_story keeps from an LLM story
+STORY_SENTENCES = 6
+
+# Model used for LLM stories unless model tiering is started
+DEFAULT_MODEL_NAME = "gpt2"
+
 
 def _simple_word(s: str) -> str:
     """Map some words to simpler synonyms for younger toddlers."""
@@ -221,7 +239,7 @@ def _simple_word(s: str) -> str:
     return replacements.get(s, s)
 
 
-def generate_story(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False, use_llm: bool = True):
+def generate_story(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False, use_llm: bool = True, deadline: float | None = None, llm_mode: str = "full", seed=None):
     """Generate a very short, toddler-friendly bedtime story.
 
     - prompt: optional small hint (e.g., favorite animal or toy)
@@ -229,73 +247,631 @@ def generate_story(prompt: str = "", child_name: str | None = None, favorite_ani
     - favorite_animal: preferred animal character
     - voice_friendly: if True, return a list of short lines (good for reading aloud)
     - use_llm: if True, use AI generation; if False, use template-based generation
+    - deadline: optional latency budget in seconds for the LLM; a template
+      story is served if the LLM has not finished in time
+    - llm_mode: "full" lets GPT-2 continue the whole story scaffold; "hybrid"
+      keeps the template skeleton and has GPT-2 write only the short creative
+      parts (much fewer generated tokens)
+    - seed: optional int or random.Random; the same seed gives the same story
+      (template and LLM sampling alike)
 
     Returns: string (paragraph) by default or list[str] when voice_friendly=True.
     """
+    rng = _seeded_rng(seed)
+    # Generate from exactly the values the cache key is made of
+    prompt, favorite_animal = _strip_inputs(prompt, favorite_animal)
+    if not _story_cache.enabled or isinstance(seed, random.Random):
+        return _generate_story_uncached(prompt, child_name, favorite_animal, voice_friendly, use_llm, deadline, llm_mode, rng)
+
+    # Serve from the result cache; stories are cached with a name slot so one
+    # entry serves every child. A seeded story has exactly one variant.
+    key = cache_key(prompt, child_name, favorite_animal, voice_friendly, use_llm, llm_mode, seed)
+    story = _story_cache.get(key, variety=1 if seed is not None else None)
+    if story is None:
+        story = _generate_story_uncached(prompt, _slot_name(child_name), favorite_animal, voice_friendly, use_llm, deadline, llm_mode, rng)
+        if _is_cacheable(story, use_llm):
+            _story_cache.put(key, story)
+    return _fill_story_name(story, child_name)
+
+
+def generate_stories(n: int, prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False, seed=None) -> list:
+    """Generate `n` template stories at once (for offline batch jobs).
+
+    Stories are the same as `generate_story(..., use_llm=False)` gives, but
+    all random choices are drawn together with NumPy (see bulk_templates).
+    `seed` is an int, a numpy.random.Generator or a random.Random.
+    """
+    # NumPy is only needed for bulk generation
+    from .bulk_templates import generate_stories as _generate_stories
+
+    return _generate_stories(n, prompt, child_name, favorite_animal, voice_friendly, seed)
+
+
+def _generate_story_uncached(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False, use_llm: bool = True, deadline: float | None = None, llm_mode: str = "full", rng: random.Random | None = None):
+    """Generate a fresh story, bypassing the result cache (see `generate_story`).
+
+    `rng` is the seeded RNG of a reproducible request, or None.
+    """
     # Check if LLM is requested and available
+    if use_llm and LLM_AVAILABLE and llm_mode == "hybrid":
+        return _generate_story_hybrid_or_template(prompt, child_name, favorite_animal, voice_friendly, rng)
     if use_llm and LLM_AVAILABLE:
-        return _generate_story_llm(prompt, child_name, favorite_animal, voice_friendly)
+        pooled = _take_pooled_story(prompt, child_name, favorite_animal, rng)
+        if pooled is not None:
+            return _format_llm_story(pooled, voice_friendly)
+        if deadline is not None:
+            return generate_story_timed(prompt, child_name, favorite_animal, voice_friendly, deadline, rng).story
+        return _generate_story_llm(prompt, child_name, favorite_animal, voice_friendly, rng)
     elif use_llm and not LLM_AVAILABLE:
         print("Warning: LLM requested but not available. Falling back to template generation.")
     
     # Fall back to template-based generation
-    return _generate_story_template(prompt, child_name, favorite_animal, voice_friendly)
+    return _generate_story_template(prompt, child_name, favorite_animal, voice_friendly, rng=rng)
 
 
-def _generate_story_llm(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False):
-    """Generate story using LLM (AI-powered generation)."""
+class TimedStory(NamedTuple):
+    """Result of `generate_story_timed`.
+
+    - path: "llm", "pool" or "template" (whichever was served)
+    - llm_seconds: LLM run time, or None if it missed the deadline
+    - template_seconds: time spent preparing the template story
+    """
+    story: object
+    path: str
+    llm_seconds: float | None
+    template_seconds: float | None
+
+
+# Worker threads for hedged LLM runs. A run that misses its deadline is
+# cancelled unless it has already reached the model; at most
+# _DEADLINE_BACKLOG runs are pending at once, beyond that sessions get their
+# template story without starting another one.
+_DEADLINE_BACKLOG = 8
+_deadline_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="llm-deadline")
+_deadline_slots = threading.BoundedSemaphore(_DEADLINE_BACKLOG)
+
+
+class _CancelScope:
+    """Scheduler futures of one LLM run, cancelled together if its caller gives up."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._futures = []
+        self.cancelled = False
+
+    def add(self, future) -> None:
+        with self._lock:
+            if self.cancelled:
+                future.cancel()
+            else:
+                self._futures.append(future)
+
+    def cancel(self) -> None:
+        with self._lock:
+            self.cancelled = True
+            for future in self._futures:
+                future.cancel()
+
+
+def generate_story_timed(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False, deadline: float = 3.0, seed=None) -> TimedStory:
+    """Race the LLM against a template story under a latency deadline.
+
+    The LLM run starts in the background while a template story is prepared
+    on the calling thread. The LLM story is served if it finishes within
+    `deadline` seconds of the call (and without error); otherwise the template
+    story is. The result reports which path won and how long each took.
+    With a `seed` both candidate stories are reproducible; which one is served
+    still depends on timing.
+    """
+    start = time.perf_counter()
+    rng = _seeded_rng(seed)
+    if not LLM_AVAILABLE:
+        story = _generate_story_template(prompt, child_name, favorite_animal, voice_friendly, rng=rng)
+        return TimedStory(story, "template", None, time.perf_counter() - start)
+
+    pooled = _take_pooled_story(prompt, child_name, favorite_animal, rng)
+    if pooled is not None:
+        return TimedStory(_format_llm_story(pooled, voice_friendly), "pool", time.perf_counter() - start, None)
+
+    if not _deadline_slots.acquire(blocking=False):
+        # Too many hedged LLM runs are pending already
+        story = _generate_story_template(prompt, child_name, favorite_animal, voice_friendly, rng=rng)
+        return TimedStory(story, "template", None, time.perf_counter() - start)
+
+    # The two paths run on different threads, so each gets its own RNG
+    llm_rng = _child_rng(rng)
+    scope = _CancelScope()
+
+    def _run_llm():
+        llm_start = time.perf_counter()
+        story = _llm_story(prompt, child_name, favorite_animal, llm_rng, scope=scope)
+        return story, time.perf_counter() - llm_start
+
+    future = _deadline_executor.submit(_run_llm)
+    future.add_done_callback(lambda _: _deadline_slots.release())
+
+    template_start = time.perf_counter()
+    template_story = _generate_story_template(prompt, child_name, favorite_animal, voice_friendly, rng=rng)
+    template_seconds = time.perf_counter() - template_start
+
+    remaining = max(0.0, deadline - (time.perf_counter() - start))
     try:
-        # Initialize the LLM generator
-        generator = LLMGenerator(model_name="gpt2")
-        
-        # Determine the character first
-        character = None
-        if favorite_animal:
-            character = favorite_animal
-        elif prompt and any(animal.lower() in prompt.lower() for animal in CHARACTERS):
-            for animal in CHARACTERS:
-                if animal.lower() in prompt.lower():
-                    character = animal
-                    break
-        else:
-            character = random.choice(CHARACTERS)
-        
-        # Build a structured prompt that follows the exact template pattern
-        if child_name and child_name.strip():
-            story_prompt = f"{character} waves hello to {child_name.strip()} with a warm smile. {character} teaches that being kind and sharing makes everyone happy. {character} plays games, dances around, and makes silly faces that make everyone giggle. {character} talks gently to {child_name.strip()} about their day and gives them a cozy hug. Now it's time for {child_name.strip()} to rest and sleep peacefully. Goodnight dear {child_name.strip()}, have the sweetest dreams."
-        else:
-            story_prompt = f"{character} waves hello with a warm smile. {character} teaches that being kind and sharing makes everyone happy. {character} plays games, dances around, and makes silly faces that make everyone giggle. Now it's time to rest and sleep peacefully. Goodnight, have the sweetest dreams."
-        
-        # Generate the story with better parameters
-        # Calculate input length in tokens
-        input_tokens = generator.tokenizer.encode(story_prompt)
-        input_length = len(input_tokens)
-        
-        generated_text = generator.generate(
-            prompt=story_prompt,
-            max_length=input_length + 50,  # Shorter for faster generation
-            temperature=0.7,  # Balanced creativity
-        )
-        
-        # The generated text includes our prompt, so we'll use it all as the story
-        story = generated_text.strip()
-        
-        # Clean up the generated text
-        story = _clean_generated_story(story, child_name, favorite_animal)
-        
-        # Add AI generation indicator (just icon)
-        story = f"🤖 {story}"
-        
-        # Format for voice-friendly output if requested
-        if voice_friendly:
-            sentences = [s.strip() for s in story.split('.') if s.strip()]
-            return [s + '.' for s in sentences if s]
-        
-        return story
-        
+        story, llm_seconds = future.result(timeout=remaining)
+    except FutureTimeoutError:
+        # Nobody will read the LLM story: drop it unless the model is already on it
+        future.cancel()
+        scope.cancel()
+        return TimedStory(template_story, "template", None, template_seconds)
     except Exception as e:
+        _report_llm_error(e)
+        return TimedStory(template_story, "template", None, template_seconds)
+    return TimedStory(_format_llm_story(story, voice_friendly), "llm", llm_seconds, template_seconds)
+
+
+def generate_story_stream(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, use_llm: bool = True, llm_mode: str = "full", seed=None):
+    """Generate a story progressively, yielding the story text as it grows.
+
+    Each yielded value is the story so far, made of complete sentences only.
+    The last value is the finished story, formatted like `generate_story`.
+    Template stories are produced in one step and yielded once. `seed` works
+    as in `generate_story`.
+    """
+    rng = _seeded_rng(seed)
+    prompt, favorite_animal = _strip_inputs(prompt, favorite_animal)
+    if not _story_cache.enabled or isinstance(seed, random.Random):
+        yield from _generate_story_stream_uncached(prompt, child_name, favorite_animal, use_llm, llm_mode, rng)
+        return
+
+    key = cache_key(prompt, child_name, favorite_animal, False, use_llm, llm_mode, seed)
+    story = _story_cache.get(key, variety=1 if seed is not None else None)
+    if story is not None:
+        yield _fill_story_name(story, child_name)
+        return
+
+    story = None
+    for story in _generate_story_stream_uncached(prompt, _slot_name(child_name), favorite_animal, use_llm, llm_mode, rng):
+        yield _fill_story_name(story, child_name)
+    if story is not None and _is_cacheable(story, use_llm):
+        _story_cache.put(key, story)
+
+
+def _generate_story_stream_uncached(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, use_llm: bool = True, llm_mode: str = "full", rng: random.Random | None = None):
+    """Stream a fresh story, bypassing the result cache (see `generate_story_stream`)."""
+    if use_llm and LLM_AVAILABLE and llm_mode == "hybrid":
+        # Hybrid stories are short to generate; serve them in one piece
+        yield _generate_story_hybrid_or_template(prompt, child_name, favorite_animal, rng=rng)
+        return
+    if use_llm and LLM_AVAILABLE:
+        pooled = _take_pooled_story(prompt, child_name, favorite_animal, rng)
+        if pooled is not None:
+            yield pooled
+            return
+        yield from _generate_story_llm_stream(prompt, child_name, favorite_animal, rng)
+        return
+    elif use_llm and not LLM_AVAILABLE:
+        print("Warning: LLM requested but not available. Falling back to template generation.")
+
+    yield _generate_story_template(prompt, child_name, favorite_animal, rng=rng)
+
+
+def _generate_story_llm_stream(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, rng: random.Random | None = None):
+    """Stream an LLM story: the scaffold first, then the finished story (see `generate_story_stream`)."""
+    try:
+        character = _pick_llm_character(prompt, favorite_animal, rng)
+        story_prompt = _build_llm_prompt(character, child_name)
+
+        complete = _complete_sentences(story_prompt)
+        text = story_prompt
+        if len(complete) < STORY_SENTENCES:
+            if not _llm_breaker.allow():
+                raise LLMLoadShed("LLM is shedding load; using template generation")
+            # The scaffold sentences are part of the story, so they can be
+            # shown before GPT-2 has produced a single token. GPT-2's part is
+            # then requested like any other, so it is batched with the
+            # stories of other sessions.
+            if complete:
+                yield "🤖 " + '. '.join(complete) + '.'
+            start = time.perf_counter()
+            try:
+                text = _llm_generate(story_prompt, child_name, rng)
+            except Exception:
+                _llm_breaker.record(time.perf_counter() - start, ok=False)
+                raise
+            _llm_breaker.record(time.perf_counter() - start)
+
+        yield "🤖 " + _clean_generated_story(text.strip(), child_name, favorite_animal)
+
+    except Exception as e:
+        _report_llm_error(e)
+        yield _generate_story_template(prompt, child_name, favorite_animal, rng=rng)
+
+
+def _complete_sentences(text: str, limit: int = STORY_SENTENCES) -> list[str]:
+    """Return up to `limit` finished ('.'-terminated) sentences of `text`."""
+    return [s.strip() for s in text.split('.')[:-1] if s.strip()][:limit]
+
+
+def _pick_llm_character(prompt: str = "", favorite_animal: str | None = None, rng: random.Random | None = None) -> str | None:
+    """Choose the story character for the LLM path."""
+    character = None
+    if favorite_animal:
+        character = favorite_animal
+    else:
+        character = _extract_animal_from_prompt(prompt) or _rng(rng).choice(CHARACTERS)
+    return character
+
+
+def _build_llm_prompt(character: str | None, child_name: str | None = None) -> str:
+    """Build the structured scaffold prompt that GPT-2 continues."""
+    if child_name and child_name.strip():
+        return f"{character} waves hello to {child_name.strip()} with a warm smile. {character} teaches that being kind and sharing makes everyone happy. {character} plays games, dances around, and makes silly faces that make everyone giggle. {character} talks gently to {child_name.strip()} about their day and gives them a cozy hug. Now it's time for {child_name.strip()} to rest and sleep peacefully. Goodnight dear {child_name.strip()}, have the sweetest dreams."
+    return f"{character} waves hello with a warm smile. {character} teaches that being kind and sharing makes everyone happy. {character} plays games, dances around, and makes silly faces that make everyone giggle. Now it's time to rest and sleep peacefully. Goodnight, have the sweetest dreams."
+
+
+def _llm_prompt_prefix(story_prompt: str, child_name: str | None = None) -> str:
+    """Return the part of `story_prompt` that depends only on the character.
+
+    This is the key for the generator's prefix KV cache: the whole scaffold
+    when there is no name, otherwise everything before the first name
+    (cut at a word boundary so the tokens match the full prompt).
+    """
+    name = child_name.strip() if child_name else ""
+    if not name or name not in story_prompt:
+        return story_prompt
+    head = story_prompt[:story_prompt.index(name)]
+    return head.rstrip(" ")
+
+
+# Placeholder written instead of the child's name in pre-generated and
+# cached stories; filled in at serve time
+NAME_SLOT = "{child_name}"
+
+_story_cache = StoryCache()
+
+# Shared by all sessions: switches everyone to templates while GPT-2 is slow
+_llm_breaker = LLMCircuitBreaker()
+
+_story_pool: StoryPool | None = None
+# Seeds the pool's stories; only the pool worker thread draws from it
+_pool_rng = random.Random()
+_story_pool_lock = threading.Lock()
+
+
+def _seeded_rng(seed) -> random.Random | None:
+    """RNG for a reproducible request: the given random.Random, or one built from an int seed."""
+    if seed is None or isinstance(seed, random.Random):
+        return seed
+    return random.Random(seed)
+
+
+def _rng(rng: random.Random | None) -> random.Random:
+    # Unseeded requests get a private RNG too, so sessions do not share state
+    return rng if rng is not None else random.Random()
+
+
+def _child_rng(rng: random.Random | None) -> random.Random | None:
+    """Independent RNG derived from `rng`, for work handed to another thread."""
+    return random.Random(rng.getrandbits(64)) if rng is not None else None
+
+
+def _model_seed(rng: random.Random | None) -> int | None:
+    """Seed for torch sampling; None keeps unseeded requests on the default sampler."""
+    return rng.getrandbits(63) if rng is not None else None
+
+
+def _strip_inputs(prompt: str | None, favorite_animal: str | None) -> tuple[str, str | None]:
+    """Prompt and animal as they go into the story and its cache key."""
+    return (prompt or "").strip(), (favorite_animal or "").strip() or None
+
+
+def _fill_name_slot(story: str, child_name: str | None = None) -> str:
+    return story.replace(NAME_SLOT, child_name.strip() if child_name else "")
+
+
+def _slot_name(child_name: str | None) -> str | None:
+    return NAME_SLOT if child_name and child_name.strip() else None
+
+
+def _fill_story_name(story, child_name: str | None = None):
+    """Fill the name slot in a story string or a list of voice-friendly lines."""
+    if isinstance(story, list):
+        return [_fill_name_slot(line, child_name) for line in story]
+    return _fill_name_slot(story, child_name)
+
+
+def _is_cacheable(story, use_llm: bool) -> bool:
+    """Do not cache a template story that stood in for a failed LLM run."""
+    if not (use_llm and LLM_AVAILABLE):
+        return True
+    text = " ".join(story) if isinstance(story, list) else story
+    return "🤖" in text
+
+
+def configure_circuit_breaker(**options) -> LLMCircuitBreaker:
+    """Replace the process-wide LLM circuit breaker (see LLMCircuitBreaker for options)."""
+    global _llm_breaker
+    _llm_breaker = LLMCircuitBreaker(**options)
+    return _llm_breaker
+
+
+def _run_guarded(run):
+    """Call `run()` (an LLM model call) through the circuit breaker.
+
+    Raises LLMLoadShed without calling it while the breaker is open, and
+    reports the call's latency and outcome otherwise.
+    """
+    if not _llm_breaker.allow():
+        raise LLMLoadShed("LLM is shedding load; using template generation")
+    start = time.perf_counter()
+    try:
+        result = run()
+    except CancelledError:
+        # The caller gave up on the story; that says nothing about the model
+        raise
+    except Exception:
+        _llm_breaker.record(time.perf_counter() - start, ok=False)
+        raise
+    _llm_breaker.record(time.perf_counter() - start)
+    return result
+
+
+def _report_llm_error(e: Exception) -> None:
+    if not isinstance(e, LLMLoadShed):
         print(f"Error generating LLM story: {e}. Falling back to template generation.")
-        return _generate_story_template(prompt, child_name, favorite_animal, voice_friendly)
+
+
+def configure_story_cache(max_entries: int = 512, ttl_seconds: float = 3600.0, variety: int = 8) -> StoryCache:
+    """Replace the process-wide story result cache.
+
+    - max_entries: most distinct parameter sets kept (LRU); 0 disables caching
+    - ttl_seconds: how long a cached story may be served
+    - variety: distinct stories collected per parameter set before serving
+      from the cache; 0 disables caching
+    """
+    global _story_cache
+    _story_cache = StoryCache(max_entries=max_entries, ttl_seconds=ttl_seconds, variety=variety)
+    return _story_cache
+
+
+def _pool_story(animal: str, personalized: bool) -> str:
+    return _llm_story(child_name=NAME_SLOT if personalized else None, favorite_animal=animal, rng=_child_rng(_pool_rng))
+
+
+def _llm_idle() -> bool:
+    """Only pre-generate when no session is waiting on or streaming from GPT-2 and the CPU is quiet."""
+    if _llm_breaker.state != CLOSED:
+        return False
+    stats = get_scheduler().stats()
+    return stats["queue_depth"] == 0 and stats["in_flight"] == 0 and cpu_is_idle()
+
+
+def start_story_pool(depth: int = 2, seed: int | None = None) -> StoryPool:
+    """Start the process-wide pool of pre-generated LLM stories (idempotent).
+
+    The pool keeps `depth` stories per animal in CHARACTERS, with and without
+    a name slot, and refills in the background while the CPU is idle. With a
+    `seed` the pool generates the same sequence of stories on every start.
+    """
+    global _story_pool, _pool_rng
+    with _story_pool_lock:
+        if _story_pool is None:
+            _pool_rng = random.Random(seed)
+            keys = [(animal, personalized) for animal in CHARACTERS for personalized in (False, True)]
+            _story_pool = StoryPool(_pool_story, keys, depth=depth, is_idle=_llm_idle).start()
+        return _story_pool
+
+
+def stop_story_pool() -> None:
+    global _story_pool
+    with _story_pool_lock:
+        if _story_pool is not None:
+            _story_pool.stop()
+            _story_pool = None
+
+
+_model_selector: ModelTierSelector | None = None
+_model_selector_lock = threading.Lock()
+
+
+def start_model_tiering(candidates=DEFAULT_TIERS, latency_budget: float = 3.0, interval: float = 600.0) -> ModelTierSelector:
+    """Serve LLM stories from the best model that fits `latency_budget` (idempotent).
+
+    `candidates` are ranked highest quality first; each is benchmarked on the
+    story scaffold at start and every `interval` seconds (see model_tiering).
+    Without tiering every story uses DEFAULT_MODEL_NAME.
+    """
+    global _model_selector
+    with _model_selector_lock:
+        if _model_selector is None:
+            scaffold = _build_llm_prompt(CHARACTERS[0])
+            prefix = _llm_prompt_prefix(scaffold)
+
+            def _benchmark(model_name: str) -> float:
+                return benchmark_story(model_name, scaffold, max_new_tokens=50, max_sentences=STORY_SENTENCES, prefix=prefix)
+
+            _model_selector = ModelTierSelector(candidates, latency_budget, _benchmark, interval=interval).start()
+        return _model_selector
+
+
+def stop_model_tiering() -> None:
+    global _model_selector
+    with _model_selector_lock:
+        if _model_selector is not None:
+            _model_selector.stop()
+            _model_selector = None
+
+
+def _llm_model_name() -> str:
+    selector = _model_selector
+    return selector.current if selector is not None else DEFAULT_MODEL_NAME
+
+
+def _observe_story_latency(model_name: str, seconds: float) -> None:
+    selector = _model_selector
+    if selector is not None:
+        selector.observe(model_name, seconds)
+
+
+def _take_pooled_story(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, rng: random.Random | None = None) -> str | None:
+    """Serve a pre-generated LLM story with the child's name filled in, if one is ready."""
+    if _story_pool is None or prompt or rng is not None:
+        # Prompted stories are not generic enough to pre-generate, and
+        # seeded requests must get the story their seed produces
+        return None
+    if favorite_animal:
+        if favorite_animal not in CHARACTERS:
+            return None
+        character = favorite_animal
+    else:
+        character = _rng(None).choice(CHARACTERS)
+    personalized = bool(child_name and child_name.strip())
+    story = _story_pool.take(character, personalized)
+    return _fill_name_slot(story, child_name) if story is not None else None
+
+
+def _llm_story(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, rng: random.Random | None = None,
+               scope: _CancelScope | None = None) -> str:
+    """Generate one LLM story (with the 🤖 marker). Errors are raised, not handled.
+
+    Cancelling `scope` drops the model request if it is still queued.
+    """
+    # Determine the character first
+    character = _pick_llm_character(prompt, favorite_animal, rng)
+
+    # Build a structured prompt that follows the exact template pattern
+    story_prompt = _build_llm_prompt(character, child_name)
+
+    if len(_complete_sentences(story_prompt)) >= STORY_SENTENCES:
+        # The scaffold already fills the story; anything GPT-2 added
+        # would be cut by _clean_generated_story
+        generated_text = story_prompt
+    else:
+        generated_text = _run_guarded(lambda: _llm_generate(story_prompt, child_name, rng, scope))
+
+    # The generated text includes our prompt, so we'll use it all as the story
+    story = generated_text.strip()
+
+    # Clean up the generated text
+    story = _clean_generated_story(story, child_name, favorite_animal)
+
+    # Add AI generation indicator (just icon)
+    return f"🤖 {story}"
+
+
+def _llm_generate(story_prompt: str, child_name: str | None = None, rng: random.Random | None = None,
+                  scope: _CancelScope | None = None) -> str:
+    """Let GPT-2 continue the story scaffold; returns the scaffold plus its text.
+
+    Bypasses the circuit breaker, so callers go through it first.
+    """
+    # Queue on the shared scheduler so concurrent sessions are batched
+    # together instead of competing for CPU with separate GPT-2 runs
+    model_name = _llm_model_name()
+    seed = _model_seed(rng)
+    start = time.perf_counter()
+    future = get_scheduler().submit(
+        story_prompt,
+        model_name=model_name,
+        max_new_tokens=50,  # Shorter for faster generation
+        temperature=0.7,  # Balanced creativity
+        prefix=_llm_prompt_prefix(story_prompt, child_name),
+        max_sentences=STORY_SENTENCES,  # Stop decoding once the story is complete
+        seed=seed,
+    )
+    if scope is not None:
+        scope.add(future)
+    generated_text = future.result()
+    _observe_story_latency(model_name, time.perf_counter() - start)
+    return generated_text
+
+
+# Hybrid mode: GPT-2 writes only these short slots of the template skeleton
+HYBRID_SLOT_TOKENS = 12
+_SLOT_CLEAN_RE = re.compile(r"[^A-Za-z ,']")
+
+
+def _clean_slot(text: str, max_words: int = 8) -> str | None:
+    """Turn a raw GPT-2 slot completion into a short clause, or None if unusable."""
+    clause = re.split(r"[.!?\n]", text, maxsplit=1)[0]
+    clause = _SLOT_CLEAN_RE.sub("", clause).strip(" ,'")
+    words = clause.split()
+    if not 2 <= len(words) <= max_words:
+        return None
+    return " ".join(words)
+
+
+def _hybrid_slot_prompts(character: str, rng: random.Random | None = None) -> list[str]:
+    """Few-shot prompts for the fun action and the life lesson."""
+    rng = _rng(rng)
+    actions = rng.sample(list(FUN_ACTIONS.values()), 2)
+    lessons = rng.sample(LIFE_LESSONS, 2)
+    fun_prompt = f"{character} {actions[0]}. {character} {actions[1]}. {character}"
+    lesson_prompt = f"{character} says {lessons[0].lower()} {character} says {lessons[1].lower()} {character} says"
+    return [fun_prompt, lesson_prompt]
+
+
+def _generate_story_hybrid(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False, rng: random.Random | None = None):
+    """Template skeleton with GPT-2 writing only the short creative slots.
+
+    The fun action and the life lesson are generated as two tiny prompts that
+    the scheduler runs as one batch (HYBRID_SLOT_TOKENS new tokens each); the
+    rest of the story comes from `_generate_story_template`. Slots GPT-2 gets
+    wrong fall back to the template's own choice.
+    """
+    seeded = rng is not None
+    rng = _rng(rng)
+    character = _pick_template_character(_extract_animal_from_prompt(prompt), favorite_animal, rng)
+    slot_prompts = _hybrid_slot_prompts(character, rng)
+    # Only a caller's seed pins the model's sampling; unseeded slots use HF sampling
+    seeds = [_model_seed(rng) if seeded else None for _ in slot_prompts]
+
+    model_name = _llm_model_name()
+
+    def _run_slots():
+        # Submit both before waiting so they share one forward pass
+        futures = [
+            get_scheduler().submit(p, model_name=model_name, max_new_tokens=HYBRID_SLOT_TOKENS, temperature=0.8, seed=seed)
+            for p, seed in zip(slot_prompts, seeds)
+        ]
+        return [f.result() for f in futures]
+
+    fun_text, lesson_text = _run_guarded(_run_slots)
+    fun_action = _clean_slot(fun_text[len(slot_prompts[0]):])
+    lesson = _clean_slot(lesson_text[len(slot_prompts[1]):], max_words=10)
+    if lesson:
+        lesson = lesson[0].upper() + lesson[1:]
+        if child_name and child_name.strip():
+            lesson = f"{child_name.strip()}, {lesson[0].lower()}{lesson[1:]}"
+
+    return _generate_story_template(
+        prompt, child_name, character, voice_friendly,
+        life_override=lesson, fun_action_override=fun_action, marker="🤖", rng=rng,
+    )
+
+
+def _generate_story_hybrid_or_template(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False, rng: random.Random | None = None):
+    try:
+        return _generate_story_hybrid(prompt, child_name, favorite_animal, voice_friendly, rng)
+    except Exception as e:
+        _report_llm_error(e)
+        return _generate_story_template(prompt, child_name, favorite_animal, voice_friendly, rng=rng)
+
+
+def _format_llm_story(story: str, voice_friendly: bool = False):
+    """Return the story as-is, or as a list of sentences when voice_friendly."""
+    if voice_friendly:
+        sentences = [s.strip() for s in story.split('.') if s.strip()]
+        return [s + '.' for s in sentences if s]
+    return story
+
+
+def _generate_story_llm(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False, rng: random.Random | None = None):
+    """Generate story using LLM (AI-powered generation)."""
+    try:
+        return _format_llm_story(_llm_story(prompt, child_name, favorite_animal, rng), voice_friendly)
+    except Exception as e:
+        _report_llm_error(e)
+        return _generate_story_template(prompt, child_name, favorite_animal, voice_friendly, rng=rng)
 
 
 def _clean_generated_story(story: str, child_name: Optional[str] = None, favorite_animal: Optional[str] = None) -> str:
@@ -313,7 +889,7 @@ def _clean_generated_story(story: str, child_name: Optional[str] = None, favorit
     # Structure: greeting, lesson, fun, talk to kid, sleep, goodbye
     structured_sentences = []
     
-    for sentence in sentences[:6]:  # Only take first 6 sentences
+    for sentence in sentences[:STORY_SENTENCES]:  # Only take first 6 sentences
         # Skip sentences that seem off-topic or unstructured
         lower_sent = sentence.lower()
         
@@ -364,64 +940,103 @@ def _clean_generated_story(story: str, child_name: Optional[str] = None, favorit
     return story
 
 
-def _generate_story_template(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False):
-    """Template-based story generation (original logic)."""
-    # Always use non-deterministic randomness (no seed)
+def _extract_animal_from_prompt(p: str) -> str | None:
+    """Return the first known character (animal) mentioned in the prompt."""
+    # Whole words only, plurals included: 'my lions' -> Lion, 'category' -> None
+    return ANIMAL_MATCHER.first(p)
 
-    # If prompt mentions a known character (animal), prefer that character
-    def _extract_animal_from_prompt(p: str) -> str | None:
-        if not p:
-            return None
-        p_low = p.lower()
-        for c in CHARACTERS:
-            if c.lower() in p_low:
-                return c
-        # simple variants like 'lion toy' or 'my elephant' -> check words
-        words = [w.strip(".,!?:;\n\t\r") for w in p_low.split()]
-        for c in CHARACTERS:
-            if c.lower() in words:
-                return c
+
+def _match_favorite_animal(favorite_animal: str | None) -> str | None:
+    """Match a favorite animal (e.g. 'owl', 'Owls', 'baby owl') to a known character."""
+    if not favorite_animal:
         return None
+    return ANIMAL_MATCHER.canonical(favorite_animal) or ANIMAL_MATCHER.first(favorite_animal)
 
-    prompt_animal = _extract_animal_from_prompt(prompt)
-    fav_animal = None
-    if favorite_animal:
-        # try to match favorite to known characters
-        fav_low = favorite_animal.strip().lower()
-        for c in CHARACTERS:
-            if c.lower() in fav_low or fav_low in c.lower():
-                fav_animal = c
-                break
-
-    # Priority: favorite animal -> prompt animal -> random
+
+def _pick_template_character(prompt_animal: str | None, favorite_animal: str | None = None, rng: random.Random | None = None) -> str:
+    """Priority: favorite animal -> prompt animal -> random.
+
+    `prompt_animal` is the caller's `_extract_animal_from_prompt(prompt)`, so
+    the prompt is scanned only once per story.
+    """
+    fav_animal = _match_favorite_animal(favorite_animal)
     if fav_animal is not None:
-        character = fav_animal
-    elif prompt_animal is not None:
-        character = prompt_animal
-    else:
-        character = random.choice(CHARACTERS)
-    location = random.choice(LOCATIONS)
-    action = random.choice(SMALL_ACTIONS)
-    tech = random.choice(TECH_LESSONS)
+        return fav_animal
+    if prompt_animal is not None:
+        return prompt_animal
+    return _rng(rng).choice(CHARACTERS)
+
+
+def _strip_leading_they(s: str) -> str:
+    # If sentence starts with 'They ' remove it for 'X says ...' phrasing
+    if not s:
+        return s
+    s_stripped = s.strip()
+    low = s_stripped.lower()
+    if low.startswith("they "):
+        no_they = s_stripped[len("They "):]
+        # Capitalize first char for nicer sentence
+        return no_they[0].upper() + no_they[1:] if no_they else no_they
+    return s_stripped
+
+
+def _fun_action(fun: str) -> str:
+    """Short verb phrase for a FUN_PARTS sentence."""
+    # Prefer a normalized short action from FUN_ACTIONS; fall back to a stripped fragment
+    fun_action = FUN_ACTIONS.get(fun)
+    if not fun_action:
+        # use the original fun fragment and strip leading 'They'
+        fun_action = _strip_leading_they(fun)
+        # make lowercase verb-phrase if it starts with a capitalized noun like 'A '
+        fun_action = fun_action[0].lower() + fun_action[1:] if fun_action and fun_action[0].isupper() else fun_action
+    return fun_action
+
+
+def _skip_prompt_line(prompt: str, prompt_animal: str | None, character: str) -> bool:
+    """True when the prompt mostly just names the character (e.g. 'lion', 'my lion')."""
+    if prompt_animal is None:
+        return False
+    # If prompt equals the animal or is a short phrase containing just the animal, skip
+    p_stripped = prompt.strip().lower()
+    if p_stripped == character.lower() or p_stripped.endswith(character.lower()) or character.lower() in p_stripped.split():
+        # very short prompts like 'lion' or 'my lion' -> skip
+        return len(p_stripped.split()) <= 3
+    return False
+
+
+def _is_goodnight_line(s: str) -> bool:
+    if not s:
+        return False
+    low = s.lower()
+    return "goodnight" in low or "night-night" in low or "night night" in low
+
+
+def _generate_story_template(prompt: str = "", child_name: str | None = None, favorite_animal: str | None = None, voice_friendly: bool = False,
+                             life_override: str | None = None, fun_action_override: str | None = None, marker: str = "📝",
+                             rng: random.Random | None = None):
+    """Template-based story generation (original logic).
+
+    `life_override` / `fun_action_override` replace the chosen life lesson and
+    fun action (used by hybrid generation); `marker` is the leading icon.
+    `rng` makes the choices reproducible (a fresh unseeded RNG by default).
+    """
+    rng = _rng(rng)
+
+    # If prompt mentions a known character (animal), prefer that character
+    prompt_animal = _extract_animal_from_prompt(prompt)
+    character = _pick_template_character(prompt_animal, favorite_animal, rng)
+    location = rng.choice(LOCATIONS)
+    action = rng.choice(SMALL_ACTIONS)
+    tech = rng.choice(TECH_LESSONS)
     # Choose life lesson (personalized if name present)
     if child_name:
         # Fill name into a personal template
-        life = random.choice(PERSONAL_LIFE_LESSONS).format(name=child_name.strip())
+        life = rng.choice(PERSONAL_LIFE_LESSONS).format(name=child_name.strip())
     else:
-        life = random.choice(LIFE_LESSONS)
-    fun = random.choice(FUN_PARTS)
-
-    def _strip_leading_they(s: str) -> str:
-        # If sentence starts with 'They ' remove it for 'X says ...' phrasing
-        if not s:
-            return s
-        s_stripped = s.strip()
-        low = s_stripped.lower()
-        if low.startswith("they "):
-            no_they = s_stripped[len("They "):]
-            # Capitalize first char for nicer sentence
-            return no_they[0].upper() + no_they[1:] if no_they else no_they
-        return s_stripped
+        life = rng.choice(LIFE_LESSONS)
+    if life_override:
+        life = life_override
+    fun = rng.choice(FUN_PARTS)
 
     # Add emoji to the character name for visual cue
     emoji = EMOJI.get(character, "")
@@ -431,9 +1046,9 @@ def _generate_story_template(prompt: str = "", child_name: str | None = None, fa
 
     # First line: fun greeting from the animal (personalized if child_name present)
     if child_name and child_name.strip():
-        greet = random.choice(PERSONAL_GREETINGS).format(name=child_name.strip())
+        greet = rng.choice(PERSONAL_GREETINGS).format(name=child_name.strip())
     else:
-        greet = random.choice(GREETINGS)
+        greet = rng.choice(GREETINGS)
 
     first = f"{emoji} {character} {greet}" if emoji else f"{character} {greet}"
     # Second line: place the animal in a cozy location or small action
@@ -453,13 +1068,7 @@ def _generate_story_template(prompt: str = "", child_name: str | None = None, fa
 
     # Add a small fun line to keep the story playful — animal acts the fun part
     # Prefer a normalized short action from FUN_ACTIONS; fall back to a stripped fragment
-    fun_action = FUN_ACTIONS.get(fun)
-    if not fun_action:
-        # use the original fun fragment and strip leading 'They'
-        fun_frag_full = fun
-        fun_action = _strip_leading_they(fun_frag_full)
-        # make lowercase verb-phrase if it starts with a capitalized noun like 'A '
-        fun_action = fun_action[0].lower() + fun_action[1:] if fun_action and fun_action[0].isupper() else fun_action
+    fun_action = fun_action_override or _fun_action(fun)
 
     # Ensure no trailing period on action before composing
     action_text = fun_action.rstrip('.')
@@ -467,20 +1076,8 @@ def _generate_story_template(prompt: str = "", child_name: str | None = None, fa
 
     # Optionally add the prompt as a small personal line.
     # If the prompt is just the animal (or contains the animal), avoid duplicating it.
-    if prompt:
-        # Keep prompt short for toddlers
-        # Skip adding if prompt mostly just names the character
-        skip_prompt_line = False
-        if prompt_animal is not None:
-            # If prompt equals the animal or is a short phrase containing just the animal, skip
-            p_stripped = prompt.strip().lower()
-            if p_stripped == character.lower() or p_stripped.endswith(character.lower()) or character.lower() in p_stripped.split():
-                # very short prompts like 'lion' or 'my lion' -> skip
-                if len(p_stripped.split()) <= 3:
-                    skip_prompt_line = True
-
-        if not skip_prompt_line:
-            lines.append(f"They thought about {prompt}.")
+    if prompt and not _skip_prompt_line(prompt, prompt_animal, character):
+        lines.append(f"They thought about {prompt}.")
 
     # If we have a child's name, add a warm personal line including the name and chosen animal
     if child_name:
@@ -491,12 +1088,6 @@ def _generate_story_template(prompt: str = "", child_name: str | None = None, fa
     # Always use normal vocabulary (no mapping step)
 
     # Remove any existing bedtime/goodnight lines to avoid duplicates
-    def _is_goodnight_line(s: str) -> bool:
-        if not s:
-            return False
-        low = s.lower()
-        return "goodnight" in low or "night-night" in low or "night night" in low
-
     lines = [l for l in lines if not _is_goodnight_line(l)]
 
     # Append a fixed farewell as the final line. Personalize when child_name is present.
@@ -512,6 +1103,6 @@ def _generate_story_template(prompt: str = "", child_name: str | None = None, fa
     story = " ".join(lines)
     
     # Add template generation indicator (just icon)
-    story = f"📝 {story}"
+    story = f"{marker} {story}"
     
     return story
@@ -0,0 +1,100 @@
+"""Inverted indexes over a story library for fast filtering.
+
+A StoryIndex is built once per library version:
+
+- animal map: lowercased `animal` field -> story ids. Animal filters keep
+  story_store's substring semantics by testing the query against the few
+  distinct animal values instead of every story.
+- posting lists: token -> story ids, for the `lesson` and `story` fields.
+  A substring query is answered by intersecting, for each query token, the
+  postings of every indexed token that contains it; the (small) candidate
+  set is then checked with the plain substring test, so results are exactly
+  those of a linear scan.
+
+Results are always in library order.
+"""
+import re
+from array import array
+from functools import lru_cache
+from typing import Dict, List, Mapping, Optional, Sequence, Set
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+class _FieldIndex:
+    """Token posting lists for one text field."""
+
+    def __init__(self, stories: Sequence[Mapping], field: str):
+        self.field = field
+        self.postings: Dict[str, array] = {}
+        for story_id, story in enumerate(stories):
+            for token in set(_TOKEN_RE.findall(story.get(field, "").lower())):
+                self.postings.setdefault(token, array("I")).append(story_id)
+        self._vocabulary = sorted(self.postings)
+        self.tokens_containing = lru_cache(maxsize=4096)(self._tokens_containing)
+
+    def _tokens_containing(self, fragment: str) -> tuple:
+        return tuple(token for token in self._vocabulary if fragment in token)
+
+    def candidates(self, query: str) -> Optional[Set[int]]:
+        """Ids that may contain `query`, or None when the query has no tokens."""
+        fragments = sorted(set(_TOKEN_RE.findall(query)), key=len, reverse=True)
+        if not fragments:
+            return None
+        result: Optional[Set[int]] = None
+        # Longest fragments first: they match the fewest tokens
+        for fragment in fragments:
+            ids: Set[int] = set()
+            for token in self.tokens_containing(fragment):
+                ids.update(self.postings[token])
+            result = ids if result is None else result & ids
+            if not result:
+                break
+        return result
+
+
+class StoryIndex:
+    """Animal map and lesson/story posting lists over `stories` (see module docstring)."""
+
+    def __init__(self, stories: Sequence[Mapping], version: Optional[int] = None):
+        self.stories = stories
+        self.version = version
+        self._animal_ids: Dict[str, array] = {}
+        for story_id, story in enumerate(stories):
+            self._animal_ids.setdefault(story.get("animal", "").lower(), array("I")).append(story_id)
+        self._animals = sorted({s["animal"].split()[0] for s in stories if s.get("animal")})
+        self._fields = {field: _FieldIndex(stories, field) for field in ("lesson", "story")}
+
+    def animals(self) -> List[str]:
+        """First word of every animal value, sorted (the library tab's animal choices)."""
+        return list(self._animals)
+
+    def _animal_matches(self, animal: str) -> Set[int]:
+        needle = animal.lower()
+        ids: Set[int] = set()
+        for value, value_ids in self._animal_ids.items():
+            if needle in value:
+                ids.update(value_ids)
+        return ids
+
+    def _field_matches(self, field: str, query: str, within: Optional[Set[int]]) -> Set[int]:
+        needle = query.lower()
+        candidates = self._fields[field].candidates(needle)
+        if candidates is None:
+            candidates = set(range(len(self.stories)))
+        if within is not None:
+            candidates &= within
+        return {i for i in candidates if needle in self.stories[i].get(field, "").lower()}
+
+    def filter(self, animal: Optional[str] = None, lesson_contains: Optional[str] = None,
+               text_contains: Optional[str] = None) -> List[Mapping]:
+        """Stories matching every given filter (case-insensitive substrings)."""
+        ids: Optional[Set[int]] = None
+        if animal:
+            ids = self._animal_matches(animal)
+        for field, query in (("lesson", lesson_contains), ("story", text_contains)):
+            if query and (ids is None or ids):
+                ids = self._field_matches(field, query, ids)
+        if ids is None:
+            return list(self.stories)
+        return [self.stories[i] for i in sorted(ids)]
@@ -0,0 +1,205 @@
+"""Memory-mapped JSONL story library with a sidecar offset index.
+
+One story per line in `stories.jsonl`; `stories.jsonl.idx` holds:
+
+    header   magic, source mtime_ns/size, record count, animal table length
+    animals  JSON {lowercased animal: [start, count, display name]} into the id table
+    offsets  uint64[count], byte offset of every record
+    ids      uint64[count], story ids grouped by animal, in library order
+
+Both files are memory-mapped, so opening a library costs the same whatever
+its size, and only the records that are actually read get decoded. The index
+is rebuilt in one streaming pass whenever it is missing or older than the
+JSONL file.
+
+Convert an existing library once:
+
+    python story_jsonl.py stories.json stories.jsonl
+"""
+import heapq
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from random import Random
+from types import MappingProxyType
+from typing import Dict, Iterator, List, Mapping, Optional, Tuple
+
+_MAGIC = b"SJL1"
+_HEADER = struct.Struct("=4sQQQQ")
+
+
+def index_path(jsonl_path: str) -> str:
+    return jsonl_path + ".idx"
+
+
+def convert_from_json(json_path: str, jsonl_path: str) -> int:
+    """Write the JSON array library at `json_path` as JSONL (plus its index). Returns the story count."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        stories = json.load(f)
+    tmp_path = jsonl_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for story in stories:
+            f.write(json.dumps(story, ensure_ascii=False))
+            f.write("\n")
+    os.replace(tmp_path, jsonl_path)
+    build_index(jsonl_path)
+    return len(stories)
+
+
+def build_index(jsonl_path: str) -> str:
+    """(Re)build the sidecar index of `jsonl_path` in one streaming pass; returns its path."""
+    st = os.stat(jsonl_path)
+    offsets = array("Q")
+    by_animal: Dict[str, Tuple[str, array]] = {}
+    with open(jsonl_path, "rb") as f:
+        pos = 0
+        for line in f:
+            if line.strip():
+                animal = str(json.loads(line).get("animal", ""))
+                by_animal.setdefault(animal.lower(), (animal, array("Q")))[1].append(len(offsets))
+                offsets.append(pos)
+            pos += len(line)
+
+    ids = array("Q")
+    table = {}
+    for key, (display, animal_ids) in by_animal.items():
+        table[key] = [len(ids), len(animal_ids), display]
+        ids.extend(animal_ids)
+    table_bytes = json.dumps(table).encode("utf-8")
+    # Pad so the uint64 arrays that follow are 8-byte aligned
+    table_bytes += b" " * (-(_HEADER.size + len(table_bytes)) % 8)
+
+    path = index_path(jsonl_path)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, st.st_mtime_ns, st.st_size, len(offsets), len(table_bytes)))
+        f.write(table_bytes)
+        f.write(offsets.tobytes())
+        f.write(ids.tobytes())
+    os.replace(tmp_path, path)
+    return path
+
+
+def _map(path: str):
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+class JsonlStoryView(Sequence):
+    """Stories of a JsonlStoryLibrary selected by id (a read-only sequence, decoded on access)."""
+
+    def __init__(self, library: "JsonlStoryLibrary", ids):
+        self._library = library
+        self._ids = ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self._library.record(story_id) for story_id in self._ids[i]]
+        return self._library.record(self._ids[i])
+
+    def __iter__(self) -> Iterator[Mapping]:
+        for story_id in self._ids:
+            yield self._library.record(story_id)
+
+    def filter(self, animal: Optional[str] = None, lesson_contains: Optional[str] = None,
+               text_contains: Optional[str] = None) -> "JsonlStoryView":
+        """Narrow the view; filters are case-insensitive substrings as in story_store.
+
+        Animal filters are answered from the index; lesson/text filters decode
+        only the stories that are still candidates.
+        """
+        ids = self._ids
+        if animal:
+            matching = self._library.animal_ids(animal)
+            if isinstance(ids, range):
+                ids = matching
+            else:
+                allowed = set(matching)
+                ids = array("Q", (story_id for story_id in ids if story_id in allowed))
+        for field, text in (("lesson", lesson_contains), ("story", text_contains)):
+            if text:
+                needle = text.lower()
+                ids = array("Q", (story_id for story_id in ids
+                                  if needle in self._library.record(story_id).get(field, "").lower()))
+        return JsonlStoryView(self._library, ids)
+
+    def random(self, rng: Optional[Random] = None) -> Optional[Mapping]:
+        """One story drawn uniformly from the view, or None if it is empty."""
+        if not len(self._ids):
+            return None
+        return self._library.record(self._ids[(rng or Random()).randrange(len(self._ids))])
+
+    def animals(self) -> List[str]:
+        """First word of every animal value, sorted (the library tab's animal choices)."""
+        return sorted({s["animal"].split()[0] for s in self if str(s.get("animal", "")).strip()})
+
+
+class JsonlStoryLibrary(JsonlStoryView):
+    """The whole JSONL library at `path`; see the module docstring for the file layout."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._data = _map(path)
+        index = self._open_index()
+        _, _, _, count, table_len = _HEADER.unpack_from(index, 0)
+        table_end = _HEADER.size + table_len
+        self._animal_table: Dict[str, list] = json.loads(bytes(index[_HEADER.size:table_end]))
+        arrays = memoryview(index)[table_end:table_end + 16 * count].cast("Q")
+        self._offsets = arrays[:count]
+        self._animal_id_table = arrays[count:]
+        super().__init__(self, range(count))
+
+    def _open_index(self):
+        st = os.stat(self.path)
+        path = index_path(self.path)
+        for attempt in range(2):
+            if os.path.exists(path):
+                index = _map(path)
+                magic, mtime_ns, size, _, _ = _HEADER.unpack_from(index, 0)
+                if (magic, mtime_ns, size) == (_MAGIC, st.st_mtime_ns, st.st_size):
+                    return index
+                index.close()
+            if attempt == 0:
+                build_index(self.path)
+        raise ValueError(f"could not build an index for {self.path}")
+
+    def record(self, story_id: int) -> Mapping:
+        """Decode the story with id `story_id` (its line number among the records)."""
+        start = self._offsets[story_id]
+        end = self._data.find(b"\n", start)
+        line = self._data[start:end if end != -1 else len(self._data)]
+        return MappingProxyType(json.loads(line))
+
+    def animal_ids(self, animal: str):
+        """Ids of the stories whose animal contains `animal` (case-insensitive), in library order."""
+        needle = animal.lower()
+        runs = [self._animal_id_table[start:start + n]
+                for key, (start, n, _) in self._animal_table.items() if needle in key]
+        if len(runs) == 1:
+            return runs[0]
+        return array("Q", heapq.merge(*runs))
+
+    def __iter__(self) -> Iterator[Mapping]:
+        # Bulk reads stream the file sequentially instead of seeking per record
+        with open(self.path, "rb") as f:
+            for line in f:
+                if line.strip():
+                    yield MappingProxyType(json.loads(line))
+
+    def animals(self) -> List[str]:
+        return sorted({display.split()[0] for _, _, display in self._animal_table.values() if display.strip()})
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "stories.json"
+    dst = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(src)[0] + ".jsonl"
+    print(f"Converted {convert_from_json(src, dst)} stories to {dst}")
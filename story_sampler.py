@@ -0,0 +1,125 @@
+"""No-repeat random story draws, one shuffle bag per filter.
+
+A StorySampler belongs to one session. For each distinct filter it keeps the
+filtered view (computed once) and a bag that walks a fresh random
+permutation of the view's positions every cycle, so no story repeats until
+the filtered set is exhausted, and a new cycle never starts with the story
+that ended the last one. The permutation is computed per draw (a Feistel
+network, see _Shuffle), so a bag costs O(1) memory whatever the size of the
+view; with SQLite and JSONL libraries each draw is one lookup by row id.
+
+With a `weight` function, each cycle instead orders the positions of the
+stories with a positive weight by weighted random keys (Efraimidis-Spirakis),
+so heavier stories tend to come earlier. Such bags hold a key per story.
+"""
+import random
+from array import array
+from typing import Callable, Dict, Mapping, Optional, Sequence, Tuple, Union
+
+from story_store import filter_stories
+
+_FilterKey = Tuple[Optional[str], Optional[str], Optional[str]]
+_MASK64 = (1 << 64) - 1
+
+
+class _Shuffle:
+    """A pseudo-random permutation of range(n), computed per index in O(1) memory.
+
+    A 4-round Feistel network permutes the smallest domain of an even number
+    of bits that holds n; indexes it maps past n are mapped again (cycle
+    walking) until they land in range, which takes under four rounds on
+    average.
+    """
+
+    def __init__(self, n: int, rng: random.Random):
+        self.n = n
+        self._half = max(1, ((n - 1).bit_length() + 1) // 2)
+        self._mask = (1 << self._half) - 1
+        self._keys = [rng.getrandbits(64) for _ in range(4)]
+
+    def _permute(self, x: int) -> int:
+        left, right = x >> self._half, x & self._mask
+        for key in self._keys:
+            mixed = ((right ^ key) * 0x9E3779B97F4A7C15) & _MASK64
+            left, right = right, left ^ ((mixed >> 32) & self._mask)
+        return (left << self._half) | right
+
+    def __getitem__(self, i: int) -> int:
+        x = self._permute(i)
+        while x >= self.n:
+            x = self._permute(x)
+        return x
+
+
+class _Bag:
+    def __init__(self, stories: Sequence[Mapping], weights: Optional[Sequence[float]]):
+        self.stories = stories
+        self.weights = weights
+        if weights is None:
+            self.size = len(stories)
+        else:
+            self.positions = array("I", (i for i, w in enumerate(weights) if w > 0))
+            self.size = len(self.positions)
+        self.order: Sequence[int] = ()
+        self.drawn = self.size
+        self.last: Optional[int] = None
+        self.swap = False
+
+    def _refill(self, rng: random.Random) -> None:
+        self.drawn = 0
+        if self.weights is None:
+            self.order = _Shuffle(self.size, rng)
+        else:
+            # Weighted random permutation: heaviest keys first
+            weights = self.weights
+            keys = {i: rng.random() ** (1.0 / weights[i]) for i in self.positions}
+            self.order = array("I", sorted(self.positions, key=keys.__getitem__, reverse=True))
+        # Do not start the cycle with the story that ended the last one
+        self.swap = self.size > 1 and self.order[0] == self.last
+
+    def draw(self, rng: random.Random) -> Optional[Mapping]:
+        if not self.size:
+            return None
+        if self.drawn == self.size:
+            self._refill(rng)
+        k = self.drawn
+        if self.swap and k < 2:
+            k = 1 - k
+        self.drawn += 1
+        self.last = self.order[k]
+        return self.stories[self.last]
+
+
+class StorySampler:
+    """Per-session random story draws without repeats (see module docstring).
+
+    `stories` is anything `filter_stories` accepts (the JSON library, a SQLite
+    store or a JSONL library). `weight` maps a story to a non-negative
+    popularity/recency weight. Stories with weight 0 are never drawn.
+    """
+
+    def __init__(self, stories: Sequence[Mapping], weight: Optional[Callable[[Mapping], float]] = None,
+                 seed: Union[int, random.Random, None] = None):
+        self.stories = stories
+        self.weight = weight
+        self._rng = seed if isinstance(seed, random.Random) else random.Random(seed)
+        self._bags: Dict[_FilterKey, _Bag] = {}
+
+    def _bag(self, animal: Optional[str], lesson_contains: Optional[str], text_contains: Optional[str]) -> _Bag:
+        key = (animal or None, lesson_contains or None, text_contains or None)
+        bag = self._bags.get(key)
+        if bag is None:
+            view = filter_stories(self.stories, animal=key[0], lesson_contains=key[1], text_contains=key[2])
+            weights = None if self.weight is None else [float(self.weight(story)) for story in view]
+            bag = self._bags[key] = _Bag(view, weights)
+        return bag
+
+    def view(self, animal: Optional[str] = None, lesson_contains: Optional[str] = None,
+             text_contains: Optional[str] = None) -> Sequence[Mapping]:
+        """The filtered stories, computed once per filter for this sampler."""
+        return self._bag(animal, lesson_contains, text_contains).stories
+
+    def draw(self, animal: Optional[str] = None, lesson_contains: Optional[str] = None,
+             text_contains: Optional[str] = None) -> Optional[Mapping]:
+        """A random matching story, not repeated until every match has been drawn; None if nothing matches."""
+        return self._bag(animal, lesson_contains, text_contains).draw(self._rng)
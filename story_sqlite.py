@@ -0,0 +1,229 @@
+"""SQLite storage engine for large story libraries.
+
+The library lives in a local SQLite database instead of one JSON array in
+memory:
+
+- `stories` table with an index on the lowercased animal
+- `stories_fts`, an external-content FTS5 table over title, story and lesson
+  with the trigram tokenizer, so substring filters use the index
+
+Queries are lazy and paginated: `SQLiteStoryStore.filter(...)` returns a
+StoryQuery that fetches rows only when they are indexed, iterated or drawn,
+so memory stays flat however large the library grows. Indexing looks the row
+up by id: the whole library's ids are one contiguous range, and the ids of a
+filtered view are read once from the index and shared by every query with
+the same filter. Results keep story_store's semantics (case-insensitive
+substring filters, library order).
+
+Create the database once from stories.json:
+
+    python story_sqlite.py stories.json stories.db
+"""
+import json
+import os
+import sqlite3
+import sys
+import threading
+from array import array
+from collections import OrderedDict
+from collections.abc import Sequence
+from random import Random
+from types import MappingProxyType
+from typing import Iterator, List, Mapping, Optional, Tuple
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS stories (
+    id INTEGER PRIMARY KEY,
+    title TEXT NOT NULL DEFAULT '',
+    animal TEXT NOT NULL DEFAULT '',
+    animal_norm TEXT NOT NULL DEFAULT '',
+    story TEXT NOT NULL DEFAULT '',
+    lesson TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS stories_animal ON stories(animal_norm);
+CREATE VIRTUAL TABLE IF NOT EXISTS stories_fts USING fts5(
+    title, story, lesson, content='stories', content_rowid='id', tokenize='trigram'
+);
+"""
+
+_COLUMNS = ("title", "animal", "story", "lesson")
+# The trigram tokenizer cannot match fragments shorter than this
+_MIN_FTS_QUERY = 3
+PAGE_SIZE = 500
+# Filtered views whose row ids are kept for indexing
+ROW_ID_CACHE_SIZE = 32
+
+
+def migrate_from_json(json_path: str, db_path: str, batch_size: int = 5000) -> int:
+    """Create (or replace) the SQLite library at `db_path` from a JSON array file.
+
+    Returns the number of stories written.
+    """
+    with open(json_path, "r", encoding="utf-8") as f:
+        stories = json.load(f)
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.executescript(_SCHEMA)
+        rows = (
+            (s.get("title", ""), s.get("animal", ""), s.get("animal", "").lower(), s.get("story", ""), s.get("lesson", ""))
+            for s in stories
+        )
+        with conn:
+            while True:
+                batch = [row for _, row in zip(range(batch_size), rows)]
+                if not batch:
+                    break
+                conn.executemany(
+                    "INSERT INTO stories (title, animal, animal_norm, story, lesson) VALUES (?, ?, ?, ?, ?)", batch
+                )
+            conn.execute("INSERT INTO stories_fts(stories_fts) VALUES ('rebuild')")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+    # Swap in atomically so readers never see a half-written library
+    os.replace(tmp_path, db_path)
+    return len(stories)
+
+
+def _fts_phrase(column: str, text: str) -> str:
+    return f'{column} : "{text.replace(chr(34), chr(34) * 2)}"'
+
+
+class StoryQuery(Sequence):
+    """A lazily evaluated, filtered view of the library (a read-only sequence)."""
+
+    def __init__(self, store: "SQLiteStoryStore", where: Tuple[str, ...] = (), params: Tuple = ()):
+        self._store = store
+        self._where = where
+        self._params = params
+        self._count: Optional[int] = None
+
+    def _sql(self, select: str) -> str:
+        where = f" WHERE {' AND '.join(self._where)}" if self._where else ""
+        return f"SELECT {select} FROM stories{where}"
+
+    def filter(self, animal: Optional[str] = None, lesson_contains: Optional[str] = None,
+               text_contains: Optional[str] = None) -> "StoryQuery":
+        """Narrow the view; filters are case-insensitive substrings as in story_store."""
+        where, params = list(self._where), list(self._params)
+        if animal:
+            needle = animal.lower()
+            values = [v for v in self._store.animal_values() if needle in v]
+            where.append(f"animal_norm IN ({', '.join('?' * len(values))})" if values else "0")
+            params.extend(values)
+        for column, text in (("lesson", lesson_contains), ("story", text_contains)):
+            if not text:
+                continue
+            if len(text) >= _MIN_FTS_QUERY:
+                where.append("id IN (SELECT rowid FROM stories_fts WHERE stories_fts MATCH ?)")
+                params.append(_fts_phrase(column, text))
+            else:
+                where.append(f"instr(lower({column}), ?) > 0")
+                params.append(text.lower())
+        return StoryQuery(self._store, tuple(where), tuple(params))
+
+    def __len__(self) -> int:
+        if self._count is None:
+            self._count = self._store.execute(self._sql("count(*)"), self._params).fetchone()[0]
+        return self._count
+
+    def page(self, offset: int = 0, limit: int = PAGE_SIZE) -> List[Mapping]:
+        rows = self._store.execute(
+            self._sql(", ".join(_COLUMNS)) + " ORDER BY id LIMIT ? OFFSET ?", self._params + (limit, offset)
+        )
+        return [MappingProxyType(dict(zip(_COLUMNS, row))) for row in rows]
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            start, stop, step = i.indices(len(self))
+            if step != 1:
+                return self.page(start, max(0, stop - start))[::step]
+            return self.page(start, max(0, stop - start))
+        ids = self._store.row_ids(self._where, self._params)
+        if not -len(ids) <= i < len(ids):
+            raise IndexError("story index out of range")
+        row = self._store.execute(f"SELECT {', '.join(_COLUMNS)} FROM stories WHERE id = ?", (ids[i],)).fetchone()
+        return MappingProxyType(dict(zip(_COLUMNS, row)))
+
+    def __iter__(self) -> Iterator[Mapping]:
+        # Keyset pagination: each page query starts where the last one ended
+        where = self._where + ("id > ?",)
+        last_id = 0
+        while True:
+            sql = f"SELECT id, {', '.join(_COLUMNS)} FROM stories WHERE {' AND '.join(where)} ORDER BY id LIMIT ?"
+            rows = self._store.execute(sql, self._params + (last_id, PAGE_SIZE)).fetchall()
+            for row in rows:
+                yield MappingProxyType(dict(zip(_COLUMNS, row[1:])))
+            if len(rows) < PAGE_SIZE:
+                return
+            last_id = rows[-1][0]
+
+    def random(self, rng: Optional[Random] = None) -> Optional[Mapping]:
+        """One story drawn uniformly from the view, or None if it is empty."""
+        count = len(self)
+        if not count:
+            return None
+        return self[(rng or Random()).randrange(count)]
+
+    def animals(self) -> List[str]:
+        """First word of every animal value, sorted (the library tab's animal choices)."""
+        rows = self._store.execute(self._sql("DISTINCT animal"), self._params)
+        return sorted({animal.split()[0] for (animal,) in rows if animal.strip()})
+
+
+class SQLiteStoryStore(StoryQuery):
+    """The whole library in `db_path`; connections are opened read-only, one per thread."""
+
+    def __init__(self, db_path: str):
+        super().__init__(self)
+        self.db_path = db_path
+        self._local = threading.local()
+        self._animal_values: Optional[List[str]] = None
+        self._row_ids: "OrderedDict[Tuple, Sequence[int]]" = OrderedDict()
+        self._row_ids_lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+            self._local.conn = conn
+        return conn
+
+    def execute(self, sql: str, params: Tuple = ()) -> sqlite3.Cursor:
+        return self._connection().execute(sql, params)
+
+    def animal_values(self) -> List[str]:
+        """Distinct lowercased animal values (read from the animal index)."""
+        if self._animal_values is None:
+            self._animal_values = [v for (v,) in self.execute("SELECT DISTINCT animal_norm FROM stories")]
+        return self._animal_values
+
+    def row_ids(self, where: Tuple[str, ...] = (), params: Tuple = ()) -> Sequence[int]:
+        """Ids of the rows matching `where`, in library order (kept for the most recent filters)."""
+        key = (where, params)
+        with self._row_ids_lock:
+            ids = self._row_ids.get(key)
+            if ids is not None:
+                self._row_ids.move_to_end(key)
+                return ids
+        query = StoryQuery(self, where, params)
+        first, last, count = self.execute(query._sql("min(id), max(id), count(*)"), params).fetchone()
+        if count and last - first + 1 == count:
+            # A migrated library numbers its rows 1..n
+            ids = range(first, last + 1)
+        else:
+            ids = array("q", (row_id for (row_id,) in self.execute(query._sql("id") + " ORDER BY id", params)))
+        with self._row_ids_lock:
+            self._row_ids[key] = ids
+            while len(self._row_ids) > ROW_ID_CACHE_SIZE:
+                self._row_ids.popitem(last=False)
+        return ids
+
+
+if __name__ == "__main__":
+    src = sys.argv[1] if len(sys.argv) > 1 else "stories.json"
+    dst = sys.argv[2] if len(sys.argv) > 2 else os.path.splitext(src)[0] + ".db"
+    print(f"Migrated {migrate_from_json(src, dst)} stories to {dst}")
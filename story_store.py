@@ -1,29 +1,188 @@
 import json
 import os
-from typing import List, Dict, Optional
+import threading
+from types import MappingProxyType
+from typing import Callable, Dict, List, Mapping, NamedTuple, Optional, Sequence, Tuple
+
+from story_index import StoryIndex
+from story_jsonl import JsonlStoryLibrary, convert_from_json
+from story_sqlite import SQLiteStoryStore, migrate_from_json
 
 _STORIES_PATH = os.path.join(os.path.dirname(__file__), "stories.json")
+_DB_PATH = os.path.join(os.path.dirname(__file__), "stories.db")
+_JSONL_PATH = os.path.join(os.path.dirname(__file__), "stories.jsonl")
+
+
+class StoryLibrary(NamedTuple):
+    """An immutable parsed story library shared by all sessions.
+
+    `version` increases every time the file is re-parsed, so indexes built
+    from a library can tell when they are stale.
+    """
+    version: int
+    stories: Tuple[Mapping, ...]
+    path: str
+    stat: Optional[Tuple[int, int]]
+
+
+_library_lock = threading.Lock()
+_libraries: Dict[str, StoryLibrary] = {}
+_indexes: Dict[str, StoryIndex] = {}
+_stores: Dict[str, Tuple[Optional[Tuple[int, int]], Sequence[Mapping]]] = {}
+_version = 0
+
+
+def _file_stat(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def load_library(path: Optional[str] = None) -> StoryLibrary:
+    """Return the parsed library at `path`, re-parsing only when its mtime or size changed."""
+    global _version
+    path = path or _STORIES_PATH
+    stat = _file_stat(path)
+    library = _libraries.get(path)
+    if library is not None and library.stat == stat:
+        return library
+
+    with _library_lock:
+        # Another session may have re-parsed it while we waited
+        library = _libraries.get(path)
+        if library is not None and library.stat == stat:
+            return library
+        stories: Tuple[Mapping, ...] = ()
+        if stat is not None:
+            with open(path, "r", encoding="utf-8") as f:
+                stories = tuple(MappingProxyType(dict(s)) for s in json.load(f))
+        _version += 1
+        library = StoryLibrary(_version, stories, path, stat)
+        _libraries[path] = library
+        return library
+
+
+def get_index(library: Optional[StoryLibrary] = None) -> StoryIndex:
+    """The StoryIndex for `library` (default: the shared library), built once per version."""
+    library = library or load_library()
+    index = _indexes.get(library.path)
+    if index is None or index.version != library.version:
+        with _library_lock:
+            index = _indexes.get(library.path)
+            if index is None or index.version != library.version:
+                index = StoryIndex(library.stories, library.version)
+                _indexes[library.path] = index
+    return index
+
 
+def _index_for(stories: Sequence[Mapping]) -> Optional[StoryIndex]:
+    """The index of the loaded library whose stories are `stories`, if any."""
+    for library in list(_libraries.values()):
+        if library.stories is stories:
+            return get_index(library)
+    return None
 
-def load_stories() -> List[Dict]:
-    if not os.path.exists(_STORIES_PATH):
-        return []
-    with open(_STORIES_PATH, "r", encoding="utf-8") as f:
-        return json.load(f)
 
+def _open_store(path: str, source: str, create: Callable[[str], object], factory: Callable[[str], Sequence[Mapping]]):
+    """The store at `path`, created once from `source` with `create(path)` if missing; reopened only when the file is replaced.
 
-def random_story(stories: List[Dict]) -> Optional[Dict]:
+    With neither file present the library is empty, as in `load_library`.
+    """
+    stat = _file_stat(path)
+    cached = _stores.get(path)
+    if cached is not None and cached[0] == stat:
+        return cached[1]
+
+    with _library_lock:
+        if stat is None:
+            if _file_stat(source) is None:
+                return ()
+            create(path)
+            stat = _file_stat(path)
+        cached = _stores.get(path)
+        if cached is None or cached[0] != stat:
+            cached = (stat, factory(path))
+            _stores[path] = cached
+        return cached[1]
+
+
+def open_sqlite_store(db_path: Optional[str] = None, json_path: Optional[str] = None) -> Sequence[Mapping]:
+    """The SQLite library at `db_path`, migrated once from `json_path` if the database does not exist yet.
+
+    Empty (and nothing is created) while neither file exists.
+    """
+    json_path = json_path or _STORIES_PATH
+    return _open_store(db_path or _DB_PATH, json_path, lambda path: migrate_from_json(json_path, path),
+                       SQLiteStoryStore)
+
+
+def open_jsonl_library(jsonl_path: Optional[str] = None, json_path: Optional[str] = None) -> Sequence[Mapping]:
+    """The memory-mapped JSONL library at `jsonl_path`, converted once from `json_path` if it does not exist yet.
+
+    Empty (and nothing is created) while neither file exists.
+    """
+    json_path = json_path or _STORIES_PATH
+    return _open_store(jsonl_path or _JSONL_PATH, json_path, lambda path: convert_from_json(json_path, path),
+                       JsonlStoryLibrary)
+
+
+def load_stories() -> Sequence[Mapping]:
+    """The stories of the shared library (read-only).
+
+    STORY_STORE_ENGINE selects the storage engine: "json" (default, see
+    `load_library`), "sqlite" (see `open_sqlite_store`; STORY_STORE_DB
+    overrides the database path) or "jsonl" (see `open_jsonl_library`;
+    STORY_STORE_JSONL overrides the library path).
+    """
+    engine = os.environ.get("STORY_STORE_ENGINE", "json").lower()
+    if engine == "sqlite":
+        return open_sqlite_store(os.environ.get("STORY_STORE_DB"))
+    if engine == "jsonl":
+        return open_jsonl_library(os.environ.get("STORY_STORE_JSONL"))
+    return load_library().stories
+
+
+def story_animals(stories: Sequence[Mapping]) -> List[str]:
+    """First word of every animal in `stories`, sorted (the library tab's animal choices)."""
+    if hasattr(stories, "animals"):
+        return stories.animals()
+    index = _index_for(stories)
+    if index is not None:
+        return index.animals()
+    return sorted({s["animal"].split()[0] for s in stories if s.get("animal")})
+
+
+def random_story(stories: Sequence[Mapping]) -> Optional[Mapping]:
     import random
 
+    if hasattr(stories, "random"):
+        return stories.random()
     if not stories:
         return None
     return random.choice(stories)
 
 
-def filter_stories(stories: List[Dict], animal: Optional[str] = None, lesson_contains: Optional[str] = None) -> List[Dict]:
+def filter_stories(stories: Sequence[Mapping], animal: Optional[str] = None, lesson_contains: Optional[str] = None,
+                   text_contains: Optional[str] = None) -> Sequence[Mapping]:
+    """Stories whose animal / lesson / story text contain the given strings (case-insensitive).
+
+    SQLite and JSONL stores return lazy views, a loaded library is filtered through
+    its StoryIndex, and any other list is scanned.
+    """
+    if not (animal or lesson_contains or text_contains):
+        return stories
+    if hasattr(stories, "filter"):
+        return stories.filter(animal=animal, lesson_contains=lesson_contains, text_contains=text_contains)
+    index = _index_for(stories)
+    if index is not None:
+        return index.filter(animal=animal, lesson_contains=lesson_contains, text_contains=text_contains)
     out = stories
     if animal:
         out = [s for s in out if animal.lower() in s.get("animal", "").lower()]
     if lesson_contains:
         out = [s for s in out if lesson_contains.lower() in s.get("lesson", "").lower()]
+    if text_contains:
+        out = [s for s in out if text_contains.lower() in s.get("story", "").lower()]
     return out
@@ -0,0 +1,35 @@
+from story_generator.animal_matcher import AnimalMatcher
+from story_generator.template_generator import CHARACTERS, _extract_animal_from_prompt, _match_favorite_animal
+
+matcher = AnimalMatcher(CHARACTERS)
+
+
+def test_first_mention_wins_with_whole_words_and_plurals():
+    assert matcher.first("Two FOXES and a lion") == "Fox"
+    assert matcher.first("the lion's den") == "Lion"
+    assert matcher.first("a category of doggedness") is None
+    assert matcher.find_all("Deer, deer and more Pigs; a Pig") == ["Deer", "Pig"]
+
+
+def test_canonical_names():
+    assert matcher.canonical(" owls ") == "Owl"
+    assert matcher.canonical("owl tree") is None
+
+
+def test_template_call_sites_use_the_matcher():
+    assert _extract_animal_from_prompt("a story about my pandas") == "Panda"
+    assert _extract_animal_from_prompt("concatenate") is None
+    assert _match_favorite_animal("baby penguin") == "Penguin"
+    assert _match_favorite_animal("Dragon") is None
+
+
+def test_template_story_scans_the_prompt_once(monkeypatch):
+    from story_generator import template_generator
+
+    scanned = []
+    first = template_generator.ANIMAL_MATCHER.first
+    monkeypatch.setattr(template_generator.ANIMAL_MATCHER, "first", lambda text: scanned.append(text) or first(text))
+
+    story = template_generator._generate_story_template("a story about my pandas")
+    assert "Panda" in story
+    assert scanned == ["a story about my pandas"]
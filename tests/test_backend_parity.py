@@ -0,0 +1,21 @@
+import os
+
+import pytest
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("optimum.onnxruntime")
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("RUN_LLM_TESTS"), reason="downloads and runs a model; set RUN_LLM_TESTS=1"
+)
+
+
+def test_onnx_backend_matches_torch_backend():
+    from story_generator.llm_generator import compare_backends
+
+    report = compare_backends(model_name=os.environ.get("LLM_TEST_MODEL", "sshleifer/tiny-gpt2"), max_new_tokens=10)
+    print(f"torch {report['torch']['latency_s']:.3f}s, onnx {report['onnx']['latency_s']:.3f}s")
+
+    assert report["outputs_match"], report
+    assert report["onnx"]["latency_s"] > 0
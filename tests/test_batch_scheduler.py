@@ -0,0 +1,114 @@
+import threading
+import time
+
+import pytest
+
+from story_generator.batch_scheduler import BatchScheduler
+
+
+class _RecordingGenerator:
+    def __init__(self):
+        self.batches = []
+
+    def generate_batch(self, prompts, max_new_tokens=50, temperature=1.0, max_sentences=None, seeds=None):
+        self.batches.append(list(prompts))
+        return [p + " done" for p in prompts]
+
+
+def test_requests_arriving_together_share_one_batch():
+    generator = _RecordingGenerator()
+    scheduler = BatchScheduler(max_batch_size=4, max_wait_ms=200, generator_factory=lambda name: generator)
+    start = threading.Event()
+    futures = []
+
+    def _submit(i):
+        start.wait()
+        futures.append(scheduler.submit(f"story {i}"))
+
+    threads = [threading.Thread(target=_submit, args=(i,)) for i in range(4)]
+    for t in threads:
+        t.start()
+    start.set()
+    for t in threads:
+        t.join()
+
+    results = sorted(f.result(timeout=5) for f in futures)
+    scheduler.shutdown()
+
+    assert results == [f"story {i} done" for i in range(4)]
+    assert generator.batches and len(generator.batches[0]) == 4
+    assert scheduler.stats()["max_batch_size_seen"] == 4
+
+
+def test_different_sampling_settings_are_not_mixed():
+    generator = _RecordingGenerator()
+    scheduler = BatchScheduler(max_batch_size=8, max_wait_ms=50, generator_factory=lambda name: generator)
+    a = scheduler.submit("a", temperature=0.7)
+    b = scheduler.submit("b", temperature=1.0)
+    assert a.result(timeout=5) == "a done"
+    assert b.result(timeout=5) == "b done"
+    scheduler.shutdown()
+
+    assert sorted(generator.batches) == [["a"], ["b"]]
+    assert scheduler.stats()["queue_depth"] == 0
+
+
+class _StreamingGenerator(_RecordingGenerator):
+    def __init__(self):
+        super().__init__()
+        self.active = 0
+        self.overlaps = 0
+        self.closed = []
+
+    def generate_stream(self, prompt, max_new_tokens=50, temperature=1.0, prefix=None, max_sentences=None, seed=None):
+        self.active += 1
+        try:
+            for word in ("once", "upon", "a", "time"):
+                time.sleep(0.005)
+                yield f" {word}"
+        finally:
+            self.active -= 1
+            self.closed.append(prompt)
+
+    def generate_batch(self, prompts, **kwargs):
+        if self.active:
+            self.overlaps += 1
+        return super().generate_batch(prompts, **kwargs)
+
+
+def test_streams_run_on_the_worker_and_never_overlap_batches():
+    generator = _StreamingGenerator()
+    scheduler = BatchScheduler(max_batch_size=4, max_wait_ms=10, generator_factory=lambda name: generator)
+    stream = scheduler.submit_stream("tell")
+    batched = scheduler.submit("b")
+
+    assert "".join(stream) == " once upon a time"
+    assert batched.result(timeout=5) == "b done"
+    scheduler.shutdown()
+
+    assert generator.overlaps == 0
+    assert scheduler.stats()["streams_served"] == 1
+    assert scheduler.stats()["in_flight"] == 0
+
+
+def test_closing_a_stream_early_stops_relaying():
+    generator = _StreamingGenerator()
+    scheduler = BatchScheduler(generator_factory=lambda name: generator)
+    stream = scheduler.submit_stream("tell")
+    assert next(stream) == " once"
+    stream.close()
+    assert scheduler.submit("b").result(timeout=5) == "b done"
+    scheduler.shutdown()
+
+    assert generator.closed == ["tell"]
+
+
+def test_stream_errors_reach_the_caller():
+    class _Broken:
+        def generate_stream(self, prompt, **kwargs):
+            raise RuntimeError("model exploded")
+
+    scheduler = BatchScheduler(generator_factory=lambda name: _Broken())
+    with pytest.raises(RuntimeError, match="exploded"):
+        list(scheduler.submit_stream("tell"))
+    scheduler.shutdown()
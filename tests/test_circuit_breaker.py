@@ -0,0 +1,42 @@
+from story_generator.circuit_breaker import CLOSED, HALF_OPEN, OPEN, LLMCircuitBreaker
+
+
+def _breaker():
+    return LLMCircuitBreaker(window=10, min_samples=4, p50_threshold=2.0, p95_threshold=5.0,
+                             error_rate_threshold=0.5, cooldown_seconds=30, probe_requests=2)
+
+
+def test_sustained_slowness_opens_breaker_for_cooldown():
+    breaker = _breaker()
+    for i in range(4):
+        assert breaker.allow(now=i)
+        breaker.record(3.0, now=i)
+
+    assert breaker.stats(now=4)["state"] == OPEN
+    assert not breaker.allow(now=10)
+
+
+def test_probes_close_breaker_after_cooldown():
+    breaker = _breaker()
+    for i in range(4):
+        breaker.record(0.1, ok=False, now=i)
+    assert not breaker.allow(now=5)
+
+    # Cooldown over: only `probe_requests` requests get through
+    assert breaker.allow(now=40) and breaker.allow(now=40)
+    assert not breaker.allow(now=40)
+    breaker.record(0.5, now=41)
+    breaker.record(0.5, now=41)
+    assert breaker.allow(now=42)
+    assert breaker.stats(now=42)["state"] == CLOSED
+
+
+def test_failed_probe_reopens_breaker():
+    breaker = _breaker()
+    for i in range(4):
+        breaker.record(9.0, now=i)
+    assert breaker.allow(now=40)
+    breaker.record(9.0, now=41)
+    assert not breaker.allow(now=42)
+    assert breaker.allow(now=80)
+    assert breaker.stats(now=80)["state"] == HALF_OPEN
@@ -0,0 +1,71 @@
+import threading
+import time
+from concurrent.futures import Future
+
+from story_generator import template_generator
+
+
+def _slow_llm_story(seconds):
+    def _story(prompt="", child_name=None, favorite_animal=None, rng=None, scope=None):
+        time.sleep(seconds)
+        return f"🤖 {favorite_animal} waves hello."
+    return _story
+
+
+def test_template_wins_when_llm_misses_deadline(monkeypatch):
+    monkeypatch.setattr(template_generator, "LLM_AVAILABLE", True)
+    monkeypatch.setattr(template_generator, "_llm_story", _slow_llm_story(0.5))
+
+    result = template_generator.generate_story_timed(favorite_animal="Owl", deadline=0.05)
+
+    assert result.path == "template"
+    assert result.story.startswith("📝")
+    assert result.llm_seconds is None and result.template_seconds is not None
+
+
+def test_llm_wins_within_deadline(monkeypatch):
+    monkeypatch.setattr(template_generator, "LLM_AVAILABLE", True)
+    monkeypatch.setattr(template_generator, "_llm_story", _slow_llm_story(0.0))
+
+    result = template_generator.generate_story_timed(favorite_animal="Owl", deadline=2.0)
+
+    assert result.path == "llm"
+    assert result.story == "🤖 Owl waves hello."
+    assert result.llm_seconds is not None
+
+
+def test_missed_deadline_cancels_the_queued_model_request(monkeypatch):
+    submitted = []
+    arrived = threading.Event()
+
+    class _StuckScheduler:
+        def submit(self, prompt, **kwargs):
+            future = Future()
+            submitted.append(future)
+            arrived.set()
+            return future
+
+    monkeypatch.setattr(template_generator, "LLM_AVAILABLE", True)
+    monkeypatch.setattr(template_generator, "get_scheduler", lambda: _StuckScheduler())
+
+    result = template_generator.generate_story_timed(favorite_animal="Owl", deadline=0.05)
+
+    assert result.path == "template"
+    assert arrived.wait(2.0)
+    deadline = time.monotonic() + 2.0
+    while not submitted[0].cancelled() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert submitted[0].cancelled()
+
+
+def test_full_backlog_serves_the_template_without_an_llm_run(monkeypatch):
+    calls = []
+    monkeypatch.setattr(template_generator, "LLM_AVAILABLE", True)
+    monkeypatch.setattr(template_generator, "_llm_story", lambda *args, **kwargs: calls.append(args))
+    monkeypatch.setattr(template_generator, "_deadline_slots", threading.BoundedSemaphore(1))
+    template_generator._deadline_slots.acquire()
+
+    result = template_generator.generate_story_timed(favorite_animal="Owl", deadline=2.0)
+
+    assert result.path == "template" and result.story.startswith("📝")
+    assert calls == []
@@ -0,0 +1,57 @@
+from concurrent.futures import Future
+
+from story_generator import template_generator
+from story_generator.template_generator import _clean_slot
+
+
+class _SlotScheduler:
+    def __init__(self, completion):
+        self.completion = completion
+        self.prompts = []
+
+    def submit(self, prompt, **kwargs):
+        self.prompts.append((prompt, kwargs))
+        future = Future()
+        future.set_result(prompt + self.completion)
+        return future
+
+
+def test_clean_slot_keeps_a_short_clause():
+    assert _clean_slot(" rolled a shiny ball. Then it") == "rolled a shiny ball"
+    assert _clean_slot(" \"hi\"") is None
+    assert _clean_slot(" a b c d e f g h i j k") is None
+
+
+def test_hybrid_story_uses_generated_slots(monkeypatch):
+    scheduler = _SlotScheduler(" rolled a shiny ball. And then")
+    monkeypatch.setattr(template_generator, "LLM_AVAILABLE", True)
+    monkeypatch.setattr(template_generator, "get_scheduler", lambda: scheduler)
+    template_generator.configure_story_cache(variety=0)
+    try:
+        story = template_generator.generate_story(favorite_animal="Owl", llm_mode="hybrid")
+    finally:
+        template_generator.configure_story_cache()
+
+    assert story.startswith("🤖")
+    assert "Owl rolled a shiny ball." in story
+    assert "Owl says Rolled a shiny ball." in story
+    assert len(scheduler.prompts) == 2
+    assert all(kw["max_new_tokens"] == template_generator.HYBRID_SLOT_TOKENS for _, kw in scheduler.prompts)
+
+
+def test_only_seeded_hybrid_stories_pin_model_sampling(monkeypatch):
+    scheduler = _SlotScheduler(" rolled a shiny ball. And then")
+    monkeypatch.setattr(template_generator, "LLM_AVAILABLE", True)
+    monkeypatch.setattr(template_generator, "get_scheduler", lambda: scheduler)
+    template_generator.configure_story_cache(max_entries=0)
+    try:
+        template_generator.generate_story(favorite_animal="Owl", llm_mode="hybrid")
+        unseeded = [kw["seed"] for _, kw in scheduler.prompts]
+        scheduler.prompts.clear()
+        template_generator.generate_story(favorite_animal="Owl", llm_mode="hybrid", seed=5)
+        seeded = [kw["seed"] for _, kw in scheduler.prompts]
+    finally:
+        template_generator.configure_story_cache()
+
+    assert unseeded == [None, None]
+    assert all(isinstance(seed, int) for seed in seeded)
@@ -0,0 +1,217 @@
+import contextlib
+import types
+
+from story_generator.llm_generator import _complete_sentence_count, _has_finished_farewell
+
+
+def test_sentence_count_matches_story_cleaning_split():
+    assert _complete_sentence_count("Lion waves hello. Lion plays") == 1
+    assert _complete_sentence_count("One. Two. Three.") == 3
+    assert _complete_sentence_count("...") == 0
+
+
+def test_farewell_counts_only_once_its_sentence_is_closed():
+    assert not _has_finished_farewell(" Goodnight, sweet")
+    assert _has_finished_farewell(" Goodnight, little owl!")
+    assert _has_finished_farewell(" Sweet dreams.")
+
+
+def test_seeded_sampler_rows_depend_only_on_their_seed():
+    import pytest
+
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("transformers")
+    from story_generator.llm_generator import SeededSampler
+
+    scores = torch.randn(3, 50)
+    picks = SeededSampler([1, 2, 1])(None, scores)
+    # Exactly one token per row survives, so greedy decoding takes the sample
+    assert torch.isfinite(picks).sum(dim=1).tolist() == [1, 1, 1]
+    again = SeededSampler([2, 1])(None, scores[[1, 2]])
+    assert torch.equal(picks[1:], again)
+
+
+class _Rows(list):
+    """A list of token id rows that slices like a 2-D tensor."""
+
+    def __getitem__(self, index):
+        if isinstance(index, tuple):
+            rows, cols = index
+            return _Rows(row[cols] for row in list.__getitem__(self, rows))
+        return list.__getitem__(self, index)
+
+    @property
+    def shape(self):
+        return (len(self), len(self[0]) if self else 0)
+
+
+class _Encoding(dict):
+    """Tokenizer output with attribute access, like transformers' BatchEncoding."""
+
+    __getattr__ = dict.__getitem__
+
+
+class _WordTokenizer:
+    """Whitespace tokenizer with a growing vocabulary; id 0 is padding."""
+
+    eos_token = "<eos>"
+    pad_token = None
+    padding_side = "right"
+
+    def __init__(self):
+        self.vocab = {"<eos>": 0}
+        self.words = ["<eos>"]
+
+    @classmethod
+    def from_pretrained(cls, name, **kwargs):
+        return cls()
+
+    @property
+    def pad_token_id(self):
+        return self.vocab[self.pad_token]
+
+    def _ids(self, text):
+        for word in text.split():
+            if word not in self.vocab:
+                self.vocab[word] = len(self.words)
+                self.words.append(word)
+        return [self.vocab[word] for word in text.split()]
+
+    def __call__(self, prompts, return_tensors=None, padding=False):
+        if isinstance(prompts, str):
+            prompts = [prompts]
+        rows = [self._ids(p) for p in prompts]
+        width = max(len(r) for r in rows) if padding else 0
+        input_ids, attention_mask = _Rows(), _Rows()
+        for row in rows:
+            pad = [self.pad_token_id] * (width - len(row))
+            input_ids.append(pad + row if self.padding_side == "left" else row + pad)
+            mask = [0] * len(pad)
+            attention_mask.append(mask + [1] * len(row) if self.padding_side == "left" else [1] * len(row) + mask)
+        return _Encoding(input_ids=input_ids, attention_mask=attention_mask)
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join(self.words[i] for i in ids if not (skip_special_tokens and i == 0))
+
+    def batch_decode(self, outputs, skip_special_tokens=True):
+        return [self.decode(row, skip_special_tokens) for row in outputs]
+
+
+class _EchoModel:
+    """Continues every row with "after-<last input word>" and records its inputs.
+
+    A forward pass returns the ids it was given as its "past_key_values".
+    """
+
+    tokenizer = None
+    calls = []
+    forwards = []
+
+    @classmethod
+    def from_pretrained(cls, name, **kwargs):
+        return cls()
+
+    def eval(self):
+        return self
+
+    def __call__(self, input_ids, use_cache=False):
+        self.forwards.append(input_ids)
+        return types.SimpleNamespace(past_key_values=[list(row) for row in input_ids])
+
+    def generate(self, input_ids, attention_mask, max_new_tokens=None, stopping_criteria=None, **kwargs):
+        self.calls.append(dict(kwargs, input_ids=input_ids))
+        tok = self.tokenizer
+        return [row + tok._ids("after-" + tok.words[row[-1]]) for row in input_ids]
+
+
+def _fake_generator(monkeypatch, **options):
+    """An LLMGenerator on the fake tokenizer and model above (no torch needed)."""
+    from story_generator import llm_generator
+
+    monkeypatch.setattr(llm_generator, "AutoTokenizer", _WordTokenizer)
+    monkeypatch.setattr(llm_generator, "AutoModelForCausalLM", _EchoModel)
+    monkeypatch.setattr(llm_generator, "resolve_snapshot", lambda *args, **kwargs: None, raising=False)
+    monkeypatch.setattr(llm_generator, "torch", types.SimpleNamespace(
+        no_grad=contextlib.nullcontext, inference_mode=contextlib.nullcontext,
+        cat=lambda tensors, dim: _Rows(a + b for a, b in zip(*tensors)),
+        ones_like=lambda ids: _Rows([1] * len(row) for row in ids),
+    ))
+    monkeypatch.setattr(_EchoModel, "calls", [])
+    monkeypatch.setattr(_EchoModel, "forwards", [])
+
+    generator = llm_generator.LLMGenerator(model_name="fake", **options)
+    monkeypatch.setattr(_EchoModel, "tokenizer", generator.tokenizer)
+    return generator
+
+
+def test_generate_batch_left_pads_and_keeps_input_order(monkeypatch):
+    generator = _fake_generator(monkeypatch)
+    tokenizer = generator.tokenizer
+    prompts = ["Owl hops", "Lion roars loudly at night", "Bear"]
+    outputs = generator.generate_batch(prompts, max_new_tokens=5)
+
+    assert outputs == [f"{p} after-{p.split()[-1]}" for p in prompts]
+    # Every row is left-padded, so each prompt ends where generation starts
+    (call,) = _EchoModel.calls
+    assert tokenizer.padding_side == "left"
+    assert call["input_ids"] == [[tokenizer.pad_token_id] * (5 - len(p.split())) + tokenizer._ids(p) for p in prompts]
+    assert generator.generate_batch([]) == []
+
+
+def test_prefix_state_is_computed_once_and_copied_for_generate(monkeypatch):
+    generator = _fake_generator(monkeypatch)
+    tokenizer = generator.tokenizer
+    prefix = "Once upon a time Owl"
+
+    assert generator.generate(prefix + " hops", max_new_tokens=5, prefix=prefix) == prefix + " hops after-hops"
+    generator.generate(prefix + " sings", max_new_tokens=5, prefix=prefix)
+
+    # One forward pass over the prefix minus its last token, shared by both calls
+    assert _EchoModel.forwards == [[tokenizer._ids(prefix)[:-1]]]
+    cached = generator.backend._prefix_cache[prefix][1]
+    for call, rest in zip(_EchoModel.calls, [" hops", " sings"]):
+        assert call["input_ids"] == [tokenizer._ids(prefix + rest)]
+        # generate() extends the cache in place, so it only ever sees a copy
+        assert call["past_key_values"] == cached and call["past_key_values"] is not cached
+
+
+def test_prefix_cache_evicts_least_recently_used(monkeypatch):
+    generator = _fake_generator(monkeypatch, prefix_cache_size=2)
+    for prefix in ["Owl hops", "Lion roars", "Owl hops", "Bear naps"]:
+        generator.generate(prefix + " away", max_new_tokens=5, prefix=prefix)
+
+    assert list(generator.backend._prefix_cache) == ["Owl hops", "Bear naps"]
+    assert len(_EchoModel.forwards) == 3
+    generator.generate("Lion roars away", max_new_tokens=5, prefix="Lion roars")
+    assert len(_EchoModel.forwards) == 4
+    assert list(generator.backend._prefix_cache) == ["Bear naps", "Lion roars"]
+
+
+def test_prefix_cache_size_zero_encodes_the_whole_prompt(monkeypatch):
+    generator = _fake_generator(monkeypatch, prefix_cache_size=0)
+    generator.generate("Owl hops away", max_new_tokens=5, prefix="Owl hops")
+
+    assert _EchoModel.forwards == []
+    (call,) = _EchoModel.calls
+    assert "past_key_values" not in call
+    assert call["input_ids"] == [generator.tokenizer._ids("Owl hops away")]
+    assert not generator.backend._prefix_cache
+
+
+def test_incomplete_backend_fails_at_construction():
+    import pytest
+
+    from story_generator.llm_generator import InferenceBackend
+
+    class _NoStreaming(InferenceBackend):
+        def load(self, model_name):
+            pass
+
+        def generate(self, prompt, **kwargs):
+            return prompt
+
+        def generate_batch(self, prompts, **kwargs):
+            return list(prompts)
+
+    with pytest.raises(TypeError, match="generate_stream"):
+        _NoStreaming()
@@ -0,0 +1,101 @@
+from story_generator.model_loading import resolve_snapshot
+
+
+def test_resolve_snapshot_prefers_snapshot_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path / "hub"))
+    (tmp_path / "snapshots" / "gpt2").mkdir(parents=True)
+    assert resolve_snapshot("gpt2", snapshot_root=str(tmp_path / "snapshots")) == str(tmp_path / "snapshots" / "gpt2")
+
+
+def test_resolve_snapshot_uses_pinned_hub_revision(tmp_path, monkeypatch):
+    monkeypatch.setenv("HF_HUB_CACHE", str(tmp_path))
+    monkeypatch.delenv("STORY_LLM_SNAPSHOT_DIR", raising=False)
+    repo = tmp_path / "models--sshleifer--tiny-gpt2"
+    (repo / "refs").mkdir(parents=True)
+    (repo / "refs" / "main").write_text("abc123\n")
+    (repo / "snapshots" / "abc123").mkdir(parents=True)
+
+    assert resolve_snapshot("sshleifer/tiny-gpt2") == str(repo / "snapshots" / "abc123")
+    # An unknown revision or model is not fetched, just reported missing
+    assert resolve_snapshot("sshleifer/tiny-gpt2", revision="def456") is None
+    assert resolve_snapshot("distilgpt2") is None
+
+
+def test_broken_snapshot_falls_back_to_the_hub(tmp_path, monkeypatch):
+    import contextlib
+    import types
+
+    from story_generator import llm_generator, model_loading
+
+    broken = tmp_path / "gpt2"
+    broken.mkdir()
+    (broken / "config.json").write_text("{not json")
+    (broken / model_loading.SAFETENSORS_FILE).write_bytes(b"\x00" * 4)
+    hub_loads = []
+
+    class _HubTokenizer:
+        pad_token = eos_token = "<eos>"
+
+        @classmethod
+        def from_pretrained(cls, name, **kwargs):
+            hub_loads.append(("tokenizer", name, kwargs))
+            return cls()
+
+    class _HubModel:
+        @classmethod
+        def from_pretrained(cls, name, **kwargs):
+            hub_loads.append(("model", name, kwargs))
+            return cls()
+
+        def eval(self):
+            return self
+
+    monkeypatch.setattr(llm_generator, "AutoTokenizer", _HubTokenizer)
+    monkeypatch.setattr(llm_generator, "AutoModelForCausalLM", _HubModel)
+    monkeypatch.setattr(llm_generator, "torch", types.SimpleNamespace(no_grad=contextlib.nullcontext))
+    monkeypatch.setattr(llm_generator, "resolve_snapshot", lambda *args, **kwargs: str(broken), raising=False)
+    # The real snapshot loaders, which cannot read this directory
+    monkeypatch.setattr(llm_generator, "load_tokenizer_offline", model_loading.load_tokenizer_offline, raising=False)
+    monkeypatch.setattr(llm_generator, "load_model_mmap", model_loading.load_model_mmap, raising=False)
+
+    backend = llm_generator.TorchBackend()
+    backend.load("gpt2")
+
+    assert backend.snapshot is None
+    assert isinstance(backend.model, _HubModel)
+    assert [(kind, name) for kind, name, _ in hub_loads] == [("tokenizer", "gpt2"), ("model", "gpt2")]
+    assert backend.tokenizer.padding_side == "left"
+
+
+def test_only_untied_parameters_count_as_unloaded():
+    import types
+
+    from story_generator.model_loading import _unloaded_parameters
+
+    # named_parameters() lists a tied weight once, under the embedding's name
+    model = types.SimpleNamespace(named_parameters=lambda: iter([
+        ("transformer.wte.weight", None), ("transformer.h.0.mlp.c_fc.weight", None),
+    ]))
+    missing = ["lm_head.weight", "transformer.h.0.attn.bias", "transformer.h.0.mlp.c_fc.weight"]
+    assert _unloaded_parameters(model, missing) == ["transformer.h.0.mlp.c_fc.weight"]
+    assert _unloaded_parameters(model, ["lm_head.weight"]) == []
+
+
+def test_mmap_load_rejects_a_snapshot_with_missing_weights(tmp_path):
+    import pytest
+
+    pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    safetensors_torch = pytest.importorskip("safetensors.torch")
+    from story_generator.model_loading import SAFETENSORS_FILE, load_model_mmap
+
+    config = transformers.GPT2Config(n_layer=1, n_head=2, n_embd=8, n_positions=16, vocab_size=32)
+    transformers.GPT2LMHeadModel(config).save_pretrained(tmp_path, safe_serialization=True)
+    assert load_model_mmap(str(tmp_path)) is not None
+
+    weights = str(tmp_path / SAFETENSORS_FILE)
+    state = safetensors_torch.load_file(weights)
+    del state[next(name for name in state if name.endswith("mlp.c_fc.weight"))]
+    safetensors_torch.save_file(state, weights, metadata={"format": "pt"})
+    with pytest.raises(RuntimeError, match="c_fc.weight"):
+        load_model_mmap(str(tmp_path))
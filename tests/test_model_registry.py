@@ -0,0 +1,40 @@
+import threading
+
+from story_generator import llm_generator, model_registry
+
+
+class _FakeGenerator:
+    loads = 0
+
+    def __init__(self, model_name: str = "gpt2", **options):
+        type(self).loads += 1
+        self.model_name = model_name
+        self.options = options
+
+
+def test_get_generator_loads_each_model_once(monkeypatch):
+    _FakeGenerator.loads = 0
+    monkeypatch.setattr(llm_generator, "LLMGenerator", _FakeGenerator)
+    model_registry.unload("fake-model")
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(model_registry.get_generator("fake-model"))) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert _FakeGenerator.loads == 1
+    assert all(r is results[0] for r in results)
+    model_registry.unload("fake-model")
+
+
+def test_unload_idle_drops_unused_models(monkeypatch):
+    monkeypatch.setattr(llm_generator, "LLMGenerator", _FakeGenerator)
+    model_registry.get_generator("fake-idle")
+    assert "fake-idle" in model_registry.loaded_models()
+
+    unloaded = model_registry.unload_idle(0.0)
+
+    assert "fake-idle" in unloaded
+    assert "fake-idle" not in model_registry.loaded_models()
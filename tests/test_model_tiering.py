@@ -0,0 +1,110 @@
+from concurrent.futures import Future
+
+from story_generator import model_registry
+from story_generator.model_tiering import ModelTierSelector
+
+
+def test_benchmark_picks_best_model_within_budget(monkeypatch):
+    timings = {"big": 5.0, "medium": 2.0, "small": 0.5}
+    benchmarked = []
+
+    def _benchmark(name):
+        benchmarked.append(name)
+        return timings[name]
+
+    unloaded = []
+    monkeypatch.setattr(model_registry, "unload", unloaded.append)
+    selector = ModelTierSelector(["big", "medium", "small"], latency_budget=3.0, benchmark_fn=_benchmark)
+
+    assert selector.current == "big"
+    assert selector.benchmark() == "medium"
+    # Benchmarks stop at the first model that fits; every other tier is unloaded
+    assert benchmarked == ["big", "medium"]
+    assert unloaded == ["big", "small"]
+
+    # A quieter host moves back up on the next benchmark
+    timings["big"] = 2.5
+    assert selector.benchmark() == "big"
+
+
+def test_benchmark_falls_back_to_fastest_model(monkeypatch):
+    monkeypatch.setattr(model_registry, "unload", lambda name: None)
+    timings = {"big": 9.0, "small": 4.0}
+    selector = ModelTierSelector(["big", "small"], latency_budget=3.0, benchmark_fn=timings.__getitem__)
+    assert selector.benchmark() == "small"
+
+
+def test_slow_live_stories_step_down_one_tier():
+    selector = ModelTierSelector(["big", "medium", "small"], latency_budget=3.0, benchmark_fn=lambda name: 1.0, window=3)
+
+    for latency in (2.0, 4.0, 5.0):
+        selector.observe("big", latency)
+    assert selector.current == "medium"
+    assert selector.stats()["step_downs"] == 1
+
+    # Stories from the previous tier no longer count
+    for _ in range(3):
+        selector.observe("big", 10.0)
+    assert selector.current == "medium"
+
+
+def test_only_the_serving_tier_stays_loaded(monkeypatch):
+    from story_generator import llm_generator
+
+    class _FakeGenerator:
+        def __init__(self, model_name="gpt2", **options):
+            self.model_name = model_name
+
+    monkeypatch.setattr(llm_generator, "LLMGenerator", _FakeGenerator)
+    tiers = ["tier-big", "tier-medium", "tier-small"]
+    timings = {"tier-big": 5.0, "tier-medium": 2.0, "tier-small": 0.5}
+
+    def _benchmark(name):
+        model_registry.get_generator(name)
+        return timings[name]
+
+    def _loaded():
+        return sorted(name for name in model_registry.loaded_models() if name in tiers)
+
+    selector = ModelTierSelector(tiers, latency_budget=3.0, benchmark_fn=_benchmark, window=1)
+    try:
+        assert selector.benchmark() == "tier-medium"
+        assert _loaded() == ["tier-medium"]
+
+        # The host gets busy: step down, and stories load the small tier
+        selector.observe("tier-medium", 4.0)
+        model_registry.get_generator(selector.current)
+        assert _loaded() == ["tier-medium", "tier-small"]
+
+        # Quiet again: the pass stops at the big tier without benchmarking the others
+        timings["tier-big"] = 1.0
+        assert selector.benchmark() == "tier-big"
+        assert _loaded() == ["tier-big"]
+    finally:
+        for name in tiers:
+            model_registry.unload(name)
+
+
+def test_benchmark_story_runs_through_the_scheduler(monkeypatch):
+    from story_generator import model_tiering
+
+    class _Untouchable:
+        def generate(self, *args, **kwargs):
+            raise AssertionError("benchmarks must not call the model directly")
+
+    submitted = []
+
+    class _Scheduler:
+        def submit(self, prompt, **kwargs):
+            submitted.append(kwargs)
+            future = Future()
+            future.set_result(prompt + " The end.")
+            return future
+
+    monkeypatch.setattr(model_tiering.model_registry, "get_generator", lambda name: _Untouchable())
+    monkeypatch.setattr(model_tiering, "get_scheduler", lambda: _Scheduler())
+
+    assert model_tiering.benchmark_story("tiny", "Once upon a time.", prefix="Once", runs=2) >= 0
+    assert [kwargs["seed"] for kwargs in submitted] == [0, 1, 2]
+    assert {kwargs["model_name"] for kwargs in submitted} == {"tiny"}
+    assert all(kwargs["prefix"] == "Once" for kwargs in submitted)
@@ -0,0 +1,42 @@
+import gc
+import os
+import sys
+
+import pytest
+
+from story_generator import llm_generator, model_registry, prefork
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="pre-fork mode needs os.fork and /proc")
+
+
+class _FakeGenerator:
+    def __init__(self, model_name: str = "gpt2", **options):
+        self.model_name = model_name
+
+
+def test_memory_report_reads_own_process():
+    report = prefork.memory_report([os.getpid()])
+    usage = report["processes"][os.getpid()]
+    assert usage["rss_mb"] > 0
+    assert report["total_pss_mb"] == usage["pss_mb"]
+
+
+def test_forked_workers_reuse_preloaded_model(monkeypatch):
+    monkeypatch.setattr(llm_generator, "LLMGenerator", _FakeGenerator)
+    model_registry.unload("fake-model")
+    try:
+        parent_generator = prefork.preload("fake-model")
+
+        def _check_worker(script, port, script_args):
+            # The child must find the parent's generator instead of loading one
+            if "fake-model" not in model_registry.loaded_models():
+                raise SystemExit(1)
+
+        monkeypatch.setattr(prefork, "_run_worker", _check_worker)
+        pids = prefork.fork_workers("app.py", workers=2, port=9000)
+        codes = [os.waitstatus_to_exitcode(os.waitpid(pid, 0)[1]) for pid in pids]
+        assert codes == [0, 0]
+        assert model_registry.get_generator("fake-model") is parent_generator
+    finally:
+        gc.unfreeze()
+        model_registry.unload("fake-model")
@@ -0,0 +1,27 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_template_generation_does_not_import_llm_stack():
+    code = textwrap.dedent(
+        """
+        import sys, time
+        start = time.perf_counter()
+        from story_generator import template_generator
+        elapsed = time.perf_counter() - start
+        template_generator.generate_story(favorite_animal="Owl", use_llm=False)
+        heavy = [m for m in ("torch", "transformers") if m in sys.modules]
+        print(elapsed)
+        print(",".join(heavy))
+        """
+    )
+    out = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    elapsed, heavy = out.stdout.split("\n")[:2]
+
+    assert heavy == ""
+    # Template-only startup should stay far below the seconds torch costs
+    assert float(elapsed) < 1.0
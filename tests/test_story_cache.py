@@ -0,0 +1,51 @@
+from story_generator import template_generator
+from story_generator.story_cache import StoryCache, cache_key
+
+
+def test_cache_collects_variety_before_serving():
+    cache = StoryCache(max_entries=4, ttl_seconds=60, variety=2)
+    key = cache_key(favorite_animal="Owl", use_llm=False)
+
+    assert cache.get(key, now=0) is None
+    cache.put(key, "a", now=0)
+    assert cache.get(key, now=1) is None
+    cache.put(key, "b", now=1)
+    assert cache.get(key, now=2) in {"a", "b"}
+    # Variants expire after the TTL
+    assert cache.get(key, now=100) is None
+
+
+def test_cache_evicts_least_recently_used_keys():
+    cache = StoryCache(max_entries=2, ttl_seconds=60, variety=1)
+    for animal in ("Owl", "Fox", "Cat"):
+        cache.put(cache_key(favorite_animal=animal), animal, now=0)
+    assert cache.get(cache_key(favorite_animal="Owl"), now=1) is None
+    assert cache.get(cache_key(favorite_animal="Cat"), now=1) == "Cat"
+
+
+def test_cached_story_is_shared_between_children():
+    template_generator.configure_story_cache(max_entries=8, ttl_seconds=60, variety=1)
+    try:
+        first = template_generator.generate_story(child_name="Mia", favorite_animal="Owl", use_llm=False)
+        second = template_generator.generate_story(child_name="Leo", favorite_animal="Owl", use_llm=False)
+    finally:
+        template_generator.configure_story_cache()
+
+    assert "Mia" in first and "Leo" in second
+    assert second == first.replace("Mia", "Leo")
+    assert template_generator.NAME_SLOT not in second
+
+
+def test_prompt_casing_never_leaks_between_requests():
+    template_generator.configure_story_cache(max_entries=8, ttl_seconds=60, variety=1)
+    try:
+        lower = template_generator.generate_story(prompt="dragons", favorite_animal="Owl", use_llm=False)
+        upper = template_generator.generate_story(prompt="Dragons", favorite_animal="Owl", use_llm=False)
+        padded = template_generator.generate_story(prompt="  Dragons ", favorite_animal="Owl", use_llm=False)
+    finally:
+        template_generator.configure_story_cache()
+
+    assert "They thought about dragons." in lower and "Dragons" not in lower
+    assert "They thought about Dragons." in upper and "dragons" not in upper
+    # Surrounding whitespace is stripped before generating, so this is a cache hit
+    assert padded == upper
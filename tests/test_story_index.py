@@ -0,0 +1,58 @@
+import json
+import random
+
+import story_store
+from story_index import StoryIndex
+
+ANIMALS = ["Lion", "Elephant", "Lion and Elephant", "Forest Animals", "Owl", "Pig"]
+WORDS = ["kind", "kindness", "share", "sharing", "brave", "gentle", "friends", "help", "sleep", "true"]
+
+
+def _linear(stories, animal=None, lesson_contains=None, text_contains=None):
+    out = list(stories)
+    if animal:
+        out = [s for s in out if animal.lower() in s.get("animal", "").lower()]
+    if lesson_contains:
+        out = [s for s in out if lesson_contains.lower() in s.get("lesson", "").lower()]
+    if text_contains:
+        out = [s for s in out if text_contains.lower() in s.get("story", "").lower()]
+    return out
+
+
+def test_index_matches_linear_substring_scan():
+    rng = random.Random(0)
+    stories = tuple(
+        {
+            "title": f"Story {i}",
+            "animal": rng.choice(ANIMALS),
+            "lesson": " ".join(rng.sample(WORDS, 3)).capitalize() + ".",
+            "story": " ".join(rng.sample(WORDS, 5)) + "!",
+        }
+        for i in range(300)
+    )
+    index = StoryIndex(stories)
+    queries = [None, "lion", "ion", "ELEPHANT", "forest", "dragon"]
+    texts = [None, "kind", "ind", "Kindness", "brave gentle", "e.", "share ", "!", "zzz"]
+    for animal in queries:
+        for lesson in texts:
+            assert index.filter(animal=animal, lesson_contains=lesson) == _linear(stories, animal, lesson)
+        for text in texts:
+            assert index.filter(animal=animal, text_contains=text) == _linear(stories, animal, text_contains=text)
+
+
+def test_animals_lists_first_words():
+    index = StoryIndex(({"animal": "Lion and Elephant"}, {"animal": "Forest Animals"}, {"animal": "Lion"}, {}))
+    assert index.animals() == ["Forest", "Lion"]
+
+
+def test_filter_stories_uses_the_library_index(tmp_path):
+    path = tmp_path / "stories.json"
+    path.write_text(json.dumps([
+        {"title": "A", "animal": "Lion", "lesson": "Be kind."},
+        {"title": "B", "animal": "Owl", "lesson": "Kindness wins."},
+    ]), encoding="utf-8")
+    library = story_store.load_library(str(path))
+
+    assert [s["title"] for s in story_store.filter_stories(library.stories, lesson_contains="kind")] == ["A", "B"]
+    assert story_store.get_index(library) is story_store.get_index(library)
+    assert story_store.get_index(library).version == library.version
@@ -0,0 +1,100 @@
+import json
+import os
+import random
+
+import pytest
+
+import story_store
+from story_jsonl import JsonlStoryLibrary, convert_from_json, index_path
+
+STORIES = [
+    {"title": "Brave Lion", "animal": "Lion", "story": "The lion shared his roar.", "lesson": "Be brave and kind."},
+    {"title": "Wise Owl", "animal": "Owl", "story": "An owl read books at night. 🦉", "lesson": "Keep learning."},
+    {"title": "Friends", "animal": "Lion and Elephant", "story": "They built a bridge.", "lesson": "Kindness wins."},
+    {"title": "Slow Snail", "animal": "Snail", "story": "Slow and steady.", "lesson": "Patience."},
+]
+
+
+@pytest.fixture
+def library(tmp_path):
+    json_path = tmp_path / "stories.json"
+    json_path.write_text(json.dumps(STORIES), encoding="utf-8")
+    jsonl_path = str(tmp_path / "stories.jsonl")
+    assert convert_from_json(str(json_path), jsonl_path) == len(STORIES)
+    return JsonlStoryLibrary(jsonl_path)
+
+
+def test_records_are_decoded_by_id(library):
+    assert len(library) == len(STORIES)
+    assert [dict(library[i]) for i in range(len(STORIES))] == STORIES
+    assert library[-1]["title"] == "Slow Snail"
+    assert [s["title"] for s in library[1:3]] == ["Wise Owl", "Friends"]
+    with pytest.raises(TypeError):
+        library[0]["title"] = "Changed"
+
+
+def test_streaming_iterator(library):
+    assert [dict(s) for s in library] == STORIES
+
+
+@pytest.mark.parametrize("filters", [
+    {"animal": "lion"},
+    {"animal": "ELEPHANT"},
+    {"animal": "cat"},
+    {"lesson_contains": "kind"},
+    {"text_contains": "🦉"},
+    {"animal": "lion", "lesson_contains": "kindness"},
+    {"animal": "owl", "text_contains": "lion"},
+])
+def test_filter_matches_linear_scan(library, filters):
+    expected = story_store.filter_stories(list(STORIES), **filters)
+    assert [dict(s) for s in story_store.filter_stories(library, **filters)] == expected
+
+
+def test_random_story_draws_from_the_filtered_view(library):
+    lions = library.filter(animal="lion")
+    assert {story_store.random_story(lions)["title"] for _ in range(30)} <= {"Brave Lion", "Friends"}
+    assert lions.random(random.Random(1)) == lions.random(random.Random(1))
+    assert story_store.random_story(library.filter(animal="tiger")) is None
+
+
+def test_animals(library):
+    assert story_store.story_animals(library) == ["Lion", "Owl", "Snail"]
+    assert story_store.story_animals(library.filter(lesson_contains="kind")) == ["Lion"]
+
+
+def test_stale_index_is_rebuilt(library):
+    with open(library.path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"title": "New", "animal": "Fox"}) + "\n")
+    os.utime(library.path, ns=(1, 1))
+    reopened = JsonlStoryLibrary(library.path)
+    assert len(reopened) == len(STORIES) + 1
+    assert reopened.filter(animal="fox")[0]["title"] == "New"
+    assert os.path.exists(index_path(library.path))
+
+
+def test_engine_is_selected_from_the_environment(tmp_path, monkeypatch):
+    json_path = tmp_path / "stories.json"
+    json_path.write_text(json.dumps(STORIES), encoding="utf-8")
+    monkeypatch.setattr(story_store, "_STORIES_PATH", str(json_path))
+    monkeypatch.setenv("STORY_STORE_ENGINE", "jsonl")
+    monkeypatch.setenv("STORY_STORE_JSONL", str(tmp_path / "stories.jsonl"))
+
+    stories = story_store.load_stories()
+    assert isinstance(stories, JsonlStoryLibrary)
+    assert story_store.load_stories() is stories
+    assert len(stories) == len(STORIES)
+
+
+def test_missing_library_is_empty_until_stories_json_appears(tmp_path, monkeypatch):
+    json_path = tmp_path / "stories.json"
+    jsonl_path = tmp_path / "stories.jsonl"
+    monkeypatch.setattr(story_store, "_STORIES_PATH", str(json_path))
+    monkeypatch.setenv("STORY_STORE_ENGINE", "jsonl")
+    monkeypatch.setenv("STORY_STORE_JSONL", str(jsonl_path))
+
+    assert len(story_store.load_stories()) == 0
+    assert not jsonl_path.exists()
+
+    json_path.write_text(json.dumps(STORIES), encoding="utf-8")
+    assert len(story_store.load_stories()) == len(STORIES)
@@ -0,0 +1,40 @@
+import time
+
+from story_generator.story_pool import StoryPool
+from story_generator.template_generator import NAME_SLOT, _fill_name_slot
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def test_pool_fills_every_key_and_refills_after_take():
+    calls = []
+
+    def _generate(animal, personalized):
+        calls.append((animal, personalized))
+        return f"{animal} story for {NAME_SLOT}" if personalized else f"{animal} story"
+
+    keys = [("Owl", False), ("Owl", True)]
+    pool = StoryPool(_generate, keys, depth=2, is_idle=lambda: True).start()
+    assert _wait_for(lambda: pool.stats()["ready"] == 4)
+
+    story = pool.take("Owl", True)
+    assert _fill_name_slot(story, " Mia ") == "Owl story for Mia"
+    assert _wait_for(lambda: pool.stats()["ready"] == 4)
+    assert pool.take("Fox", False) is None
+    pool.stop()
+
+    assert pool.stats()["hits"] == 1 and pool.stats()["misses"] == 1
+
+
+def test_pool_waits_while_cpu_is_busy():
+    pool = StoryPool(lambda a, p: "story", [("Owl", False)], depth=1, is_idle=lambda: False, idle_poll=0.01).start()
+    time.sleep(0.1)
+    pool.stop()
+    assert pool.stats()["generated"] == 0
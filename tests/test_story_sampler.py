@@ -0,0 +1,73 @@
+import random
+from collections import Counter
+
+from story_sampler import StorySampler
+
+STORIES = [{"title": f"Story {i}", "animal": "Lion" if i % 2 else "Owl", "lesson": "", "story": ""}
+           for i in range(10)]
+
+
+def test_no_repeats_until_the_bag_is_exhausted():
+    sampler = StorySampler(STORIES, seed=1)
+    draws = [sampler.draw()["title"] for _ in range(30)]
+    for cycle in range(3):
+        assert sorted(draws[cycle * 10:(cycle + 1) * 10]) == sorted(s["title"] for s in STORIES)
+    # ...and never the same story twice in a row, even across bag boundaries
+    assert all(a != b for a, b in zip(draws, draws[1:]))
+
+
+def test_bags_are_kept_per_filter():
+    sampler = StorySampler(STORIES, seed=2)
+    lions = [sampler.draw(animal="lion")["title"] for _ in range(5)]
+    owl = sampler.draw(animal="owl")
+    assert sorted(lions) == [f"Story {i}" for i in (1, 3, 5, 7, 9)]
+    assert owl["animal"] == "Owl"
+    assert sampler.view(animal="lion") is sampler.view(animal="lion")
+    assert sampler.draw(animal="tiger") is None
+
+
+def test_two_story_bag_alternates():
+    sampler = StorySampler(STORIES[:2], seed=3)
+    draws = [sampler.draw()["title"] for _ in range(10)]
+    assert all(a != b for a, b in zip(draws, draws[1:]))
+
+
+def test_seeded_samplers_agree():
+    a, b = StorySampler(STORIES, seed=7), StorySampler(STORIES, seed=random.Random(7))
+    assert [a.draw()["title"] for _ in range(15)] == [b.draw()["title"] for _ in range(15)]
+
+
+def test_weights_order_bags_and_exclude_zero_weight():
+    weight = {"Story 0": 100.0, "Story 1": 0.0}
+    firsts = Counter()
+    for seed in range(200):
+        sampler = StorySampler(STORIES, weight=lambda s: weight.get(s["title"], 1.0), seed=seed)
+        draws = [sampler.draw()["title"] for _ in range(18)]
+        assert "Story 1" not in draws
+        assert sorted(draws[:9]) == sorted(draws[9:])
+        assert all(a != b for a, b in zip(draws, draws[1:]))
+        firsts[draws[0]] += 1
+    assert firsts["Story 0"] > 150
+
+
+def test_shuffle_is_a_permutation_that_depends_on_the_rng():
+    from story_sampler import _Shuffle
+
+    for n in list(range(1, 70)) + [1000, 4097]:
+        assert sorted(_Shuffle(n, random.Random(n))[i] for i in range(n)) == list(range(n))
+    orders = {tuple(_Shuffle(10, random.Random(seed))[i] for i in range(10)) for seed in range(20)}
+    assert len(orders) > 15
+
+
+def test_sqlite_library_is_drawn_without_repeats(tmp_path):
+    import json
+
+    from story_sqlite import SQLiteStoryStore, migrate_from_json
+
+    json_path = tmp_path / "stories.json"
+    json_path.write_text(json.dumps(STORIES), encoding="utf-8")
+    migrate_from_json(str(json_path), str(tmp_path / "stories.db"))
+    sampler = StorySampler(SQLiteStoryStore(str(tmp_path / "stories.db")), seed=4)
+
+    lions = [sampler.draw(animal="lion")["title"] for _ in range(10)]
+    assert sorted(lions[:5]) == sorted(lions[5:]) == [f"Story {i}" for i in (1, 3, 5, 7, 9)]
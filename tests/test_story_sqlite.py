@@ -0,0 +1,107 @@
+import json
+import random
+
+import pytest
+
+import story_store
+from story_sqlite import SQLiteStoryStore, migrate_from_json
+
+STORIES = [
+    {"title": "Brave Lion", "animal": "Lion", "story": "The lion shared his \"big\" roar.", "lesson": "Be brave and kind."},
+    {"title": "Wise Owl", "animal": "Owl", "story": "An owl read books at night.", "lesson": "Keep learning."},
+    {"title": "Friends", "animal": "Lion and Elephant", "story": "They built a bridge.", "lesson": "Kindness wins."},
+    {"title": "Slow Snail", "animal": "Snail", "story": "Slow and steady, an ox watched.", "lesson": "Patience."},
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    json_path = tmp_path / "stories.json"
+    json_path.write_text(json.dumps(STORIES), encoding="utf-8")
+    db_path = str(tmp_path / "stories.db")
+    assert migrate_from_json(str(json_path), db_path) == len(STORIES)
+    return SQLiteStoryStore(db_path)
+
+
+@pytest.mark.parametrize("filters", [
+    {"animal": "lion"},
+    {"animal": "ELEPHANT"},
+    {"animal": "cat"},
+    {"lesson_contains": "kind"},
+    {"lesson_contains": "be"},
+    {"text_contains": '"big"'},
+    {"text_contains": "ox"},
+    {"animal": "lion", "lesson_contains": "kindness"},
+    {"animal": "owl", "text_contains": "lion"},
+])
+def test_filter_matches_linear_scan(store, filters):
+    expected = story_store.filter_stories(list(STORIES), **filters)
+    result = story_store.filter_stories(store, **filters)
+    assert [dict(s) for s in result] == expected
+    assert len(result) == len(expected)
+
+
+def test_store_is_a_lazy_sequence(store):
+    assert len(store) == len(STORIES)
+    assert store[0]["title"] == "Brave Lion"
+    assert store[-1]["title"] == "Slow Snail"
+    assert [s["title"] for s in store[1:3]] == ["Wise Owl", "Friends"]
+    assert store.page(offset=2, limit=10)[0]["title"] == "Friends"
+    with pytest.raises(IndexError):
+        store[len(STORIES)]
+    with pytest.raises(TypeError):
+        store[0]["title"] = "Changed"
+
+
+def test_filtered_views_are_indexed_by_row_id(store):
+    lions = story_store.filter_stories(store, animal="lion")
+    assert [lions[i]["title"] for i in range(len(lions))] == ["Brave Lion", "Friends"]
+    assert lions[-1]["title"] == "Friends"
+    # The whole library is one contiguous range of ids
+    assert store.row_ids() == range(1, len(STORIES) + 1)
+    with pytest.raises(IndexError):
+        lions[2]
+
+
+def test_iteration_pages_through_the_whole_library(store, monkeypatch):
+    monkeypatch.setattr("story_sqlite.PAGE_SIZE", 1)
+    assert [s["title"] for s in store] == [s["title"] for s in STORIES]
+
+
+def test_random_story_draws_from_the_filtered_view(store):
+    lions = story_store.filter_stories(store, animal="lion")
+    assert {story_store.random_story(lions)["title"] for _ in range(30)} <= {"Brave Lion", "Friends"}
+    assert lions.random(random.Random(1)) == lions.random(random.Random(1))
+    assert story_store.random_story(store.filter(animal="tiger")) is None
+
+
+def test_animals(store):
+    assert story_store.story_animals(store) == ["Lion", "Owl", "Snail"]
+
+
+def test_engine_is_selected_from_the_environment(tmp_path, monkeypatch):
+    json_path = tmp_path / "stories.json"
+    json_path.write_text(json.dumps(STORIES), encoding="utf-8")
+    db_path = str(tmp_path / "stories.db")
+    monkeypatch.setattr(story_store, "_STORIES_PATH", str(json_path))
+    monkeypatch.setenv("STORY_STORE_ENGINE", "sqlite")
+    monkeypatch.setenv("STORY_STORE_DB", db_path)
+
+    stories = story_store.load_stories()
+    assert isinstance(stories, SQLiteStoryStore)
+    assert story_store.load_stories() is stories
+    assert len(stories) == len(STORIES)
+
+
+def test_missing_library_is_empty_until_stories_json_appears(tmp_path, monkeypatch):
+    json_path = tmp_path / "stories.json"
+    db_path = tmp_path / "stories.db"
+    monkeypatch.setattr(story_store, "_STORIES_PATH", str(json_path))
+    monkeypatch.setenv("STORY_STORE_ENGINE", "sqlite")
+    monkeypatch.setenv("STORY_STORE_DB", str(db_path))
+
+    assert len(story_store.load_stories()) == 0
+    assert not db_path.exists()
+
+    json_path.write_text(json.dumps(STORIES), encoding="utf-8")
+    assert len(story_store.load_stories()) == len(STORIES)
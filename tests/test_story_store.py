@@ -0,0 +1,37 @@
+import json
+import os
+
+import pytest
+
+import story_store
+
+
+def _write(path, stories, mtime_ns=None):
+    path.write_text(json.dumps(stories), encoding="utf-8")
+    if mtime_ns is not None:
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_library_is_parsed_once_until_the_file_changes(tmp_path):
+    path = tmp_path / "stories.json"
+    _write(path, [{"title": "A", "animal": "Lion"}], mtime_ns=1_000_000_000)
+
+    first = story_store.load_library(str(path))
+    assert story_store.load_library(str(path)) is first
+
+    _write(path, [{"title": "A", "animal": "Lion"}, {"title": "B", "animal": "Owl"}], mtime_ns=2_000_000_000)
+    second = story_store.load_library(str(path))
+    assert second.version > first.version
+    assert [s["title"] for s in second.stories] == ["A", "B"]
+
+
+def test_library_stories_are_read_only(tmp_path):
+    path = tmp_path / "stories.json"
+    _write(path, [{"title": "A", "animal": "Lion"}])
+    story = story_store.load_library(str(path)).stories[0]
+    with pytest.raises(TypeError):
+        story["title"] = "B"
+
+
+def test_missing_library_is_empty(tmp_path):
+    assert story_store.load_library(str(tmp_path / "missing.json")).stories == ()
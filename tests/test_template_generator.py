@@ -1,7 +1,83 @@
-from story_generator.template_generator import generate_story
+from story_generator.template_generator import generate_story, generate_story_stream
 
 
 def test_generate_story_returns_string():
     s = generate_story(prompt="test", seed=1)
     assert isinstance(s, str)
     assert len(s) > 0
+
+
+def test_generate_story_stream_template_yields_final_story():
+    parts = list(generate_story_stream(favorite_animal="Owl", use_llm=False))
+    assert len(parts) == 1
+    assert parts[0].startswith("📝")
+    assert "Owl" in parts[0]
+
+
+def test_llm_prompt_prefix_is_character_only_part_of_scaffold():
+    from story_generator.template_generator import _build_llm_prompt, _llm_prompt_prefix
+
+    unnamed = _build_llm_prompt("Owl")
+    assert _llm_prompt_prefix(unnamed) == unnamed
+
+    named = _build_llm_prompt("Owl", "Mia")
+    prefix = _llm_prompt_prefix(named, "Mia")
+    assert named.startswith(prefix)
+    assert "Mia" not in prefix and not prefix.endswith(" ")
+
+
+def test_seeded_stories_are_reproducible():
+    import random
+
+    from story_generator import template_generator
+
+    template_generator.configure_story_cache(max_entries=0)
+    try:
+        first = generate_story(child_name="Mia", use_llm=False, seed=7)
+        assert first == generate_story(child_name="Mia", use_llm=False, seed=7)
+        assert {generate_story(use_llm=False, seed=s) for s in range(20)} != {first}
+        # An injected RNG gives the same story as the int seed it was built from
+        assert generate_story(child_name="Mia", use_llm=False, seed=random.Random(7)) == first
+    finally:
+        template_generator.configure_story_cache()
+
+
+def test_seeded_story_is_cached_per_seed():
+    from story_generator import template_generator
+
+    template_generator.configure_story_cache(max_entries=8, ttl_seconds=60, variety=8)
+    try:
+        story = generate_story(favorite_animal="Fox", use_llm=False, seed=3)
+        assert template_generator._story_cache.get(
+            template_generator.cache_key(favorite_animal="Fox", use_llm=False, seed=3), variety=1
+        ) == story
+        assert generate_story(favorite_animal="Fox", use_llm=False, seed=3) == story
+    finally:
+        template_generator.configure_story_cache()
+
+
+def test_llm_stream_goes_through_the_batched_scheduler_path(monkeypatch):
+    from story_generator import template_generator
+    from story_generator.batch_scheduler import BatchScheduler
+
+    class _Writer:
+        def generate(self, prompt, **kwargs):
+            return prompt + " Owl shares a snack. Owl yawns."
+
+        def generate_batch(self, prompts, **kwargs):
+            return [self.generate(p) for p in prompts]
+
+    scheduler = BatchScheduler(generator_factory=lambda name: _Writer())
+    monkeypatch.setattr(template_generator, "LLM_AVAILABLE", True)
+    monkeypatch.setattr(template_generator, "get_scheduler", lambda: scheduler)
+    try:
+        parts = list(generate_story_stream(favorite_animal="Owl", seed=3))
+    finally:
+        scheduler.shutdown()
+
+    # The scaffold is shown first, then the finished story
+    assert len(parts) == 2
+    assert parts[1].startswith(parts[0].rstrip("."))
+    assert "Owl shares a snack." in parts[-1]
+    stats = scheduler.stats()
+    assert stats["requests_served"] == 1 and stats["streams_served"] == 0